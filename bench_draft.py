@@ -0,0 +1,298 @@
+import argparse
+import asyncio
+import datetime
+import logging
+import os
+import random
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+import metrics
+from draft import ADMIN_ROLE_NAME, DRAFT_TIMEZONE, EventDraft
+from fakes import (ApiStats, FakeBot, FakeGuild, FakeInteraction, FakeMember, FakeSheetsClient, FakeSpreadsheet,
+                   FakeTextChannel, Latency, make_event_worksheet)
+from outbound_queue import CHANNEL_BUCKET_CAPACITY, CHANNEL_BUCKET_PERIOD, GLOBAL_REQUESTS_PER_SECOND, outbound_queue
+from pick_journal import JOURNAL_FLUSH_DELAY
+from sheet_access import AsyncSheets
+
+# Offline draft benchmark, simulates full drafts against the fakes, ex.
+#   python bench_draft.py --drafters 8 --teams 40 --discord-latency 0.05 --sheets-latency 0.3
+# Reports Discord and Sheets call counts, wall clock time and event loop lag. No network or credentials needed.
+
+LAG_SAMPLE_INTERVAL = 0.01
+DRIVER_POLL_INTERVAL = 0.001
+
+logger = logging.getLogger('fantasy_first')
+
+
+class BenchDraft(EventDraft):
+    """EventDraft that exposes its pick cutoff so the benchmark can time drafters out on demand, and signals
+    turn_ready whenever it starts waiting on the next action"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pick_cutoff: asyncio.Future = None
+        self.turn_ready = asyncio.Event()
+
+    def schedule_pick_deadline(self, deadline: datetime.datetime) -> asyncio.Future:
+        self.pick_cutoff = super().schedule_pick_deadline(deadline)
+        return self.pick_cutoff
+
+    async def run_draft_loop(self):
+        # The loop resets the grid's futures right before every wait, with no await in between
+        reset_futures = self.grid.reset_futures
+
+        def reset_and_signal():
+            reset_futures()
+            self.turn_ready.set()
+
+        self.grid.reset_futures = reset_and_signal
+        await super().run_draft_loop()
+
+
+@dataclass
+class DraftScript:
+    """How the simulated drafters behave on each turn"""
+    skip_rate: float = 0.0  # Chance an admin skips the current drafter
+    timeout_rate: float = 0.0  # Chance the current drafter times out
+    late_pick_rate: float = 0.5  # Chance a skipped drafter picks before the current one
+    think_time: float = 0.0  # Max seconds a drafter waits before acting
+
+
+@dataclass
+class DraftResult:
+    picks: int = 0
+    skips: int = 0
+    timeouts: int = 0
+    late_picks: int = 0
+    # Seconds from a button click to the draft waiting for the next pick
+    pick_latencies: list[float] = field(default_factory=list)
+
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes up a sleeping task, a stand-in for how long callbacks wait to run"""
+
+    def __init__(self, interval: float = LAG_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.lags: list[float] = []
+        self._task: asyncio.Task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self):
+        while True:
+            sleep_start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - sleep_start - self.interval))
+
+    def summary(self) -> str:
+        return f"loop lag p50 {percentile(self.lags, 50) * 1000:.2f}ms, p99 {percentile(self.lags, 99) * 1000:.2f}ms, " \
+               f"max {max(self.lags, default=0.0) * 1000:.2f}ms"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+@dataclass
+class SimulatedEvent:
+    event_id: str
+    draft: BenchDraft
+    channel: FakeTextChannel
+    admin: FakeMember
+    drafters: dict[str, FakeMember]
+
+
+async def create_event(event_num: int, num_drafters: int, num_teams: int, num_rounds: int, guild: FakeGuild,
+                       bot: FakeBot, spreadsheet: FakeSpreadsheet, sheets: AsyncSheets, stats: ApiStats,
+                       discord_latency: Latency, journal_flush_delay: float,
+                       compact_picker: bool = False) -> SimulatedEvent:
+    """Sets up an event page, a draft channel and its drafters, and loads the draft from the fake sheet"""
+    event_id = f"bench{event_num}"
+    drafter_names = [f"E{event_num} Drafter {drafter_idx + 1}" for drafter_idx in range(num_drafters)]
+    drafters = {name: guild.add_member(name) for name in drafter_names}
+    for member in drafters.values():
+        member.attach(stats, discord_latency)
+    admin = guild.add_member(f"E{event_num} Admin", [ADMIN_ROLE_NAME])
+    admin.attach(stats, discord_latency)
+    bot.member_index.forget_guild(guild)  # Members were added after the index may have been built
+
+    teams = {team_num: f"Team {team_num}" for team_num in range(event_num * 10000 + 1,
+                                                                event_num * 10000 + num_teams + 1)}
+    now = datetime.datetime.now(DRAFT_TIMEZONE)
+    worksheet = make_event_worksheet(spreadsheet, f"Event {event_num}", event_id, teams, drafter_names,
+                                     draft_end=now + datetime.timedelta(days=3),
+                                     active_hours=(datetime.time(0), datetime.time(23, 59)))
+    channel = FakeTextChannel(guild, f"draft-{event_id}", stats, discord_latency)
+    interaction = FakeInteraction(channel, bot, admin)
+
+    draft = BenchDraft(event_id, sheets.worksheet(worksheet), interaction)
+    draft.num_picks = num_rounds
+    draft.compact_picker = compact_picker
+    draft.pick_journal.flush_delay = journal_flush_delay
+    await draft.load_event_page()
+    return SimulatedEvent(event_id, draft, channel, admin, drafters)
+
+
+async def wait_for_turn(draft: BenchDraft, draft_task: asyncio.Task) -> bool:
+    """Waits until the draft is ready for the next action, False if it ended instead"""
+    if not draft.turn_ready.is_set():
+        turn_task = asyncio.create_task(draft.turn_ready.wait())
+        await asyncio.wait([turn_task, draft_task], return_when=asyncio.FIRST_COMPLETED)
+        turn_task.cancel()
+    if draft_task.done():
+        return False
+    draft.turn_ready.clear()
+    return True
+
+
+async def drive_draft(event: SimulatedEvent, draft_task: asyncio.Task, script: DraftScript,
+                      rng: random.Random) -> DraftResult:
+    """Plays every drafter and the admin until the draft finishes"""
+    result = DraftResult()
+    action_time = None
+
+    while await wait_for_turn(event.draft, draft_task):
+        if action_time is not None:
+            result.pick_latencies.append(time.perf_counter() - action_time)
+        if script.think_time:
+            await asyncio.sleep(rng.uniform(0, script.think_time))
+        action_time = time.perf_counter()
+        await take_turn(event, script, rng, result)
+
+    await draft_task  # Raises if the draft failed
+    return result
+
+
+async def take_turn(event: SimulatedEvent, script: DraftScript, rng: random.Random, result: DraftResult) -> int | None:
+    """Picks, skips or times out the current drafter, returning the team number if a team was picked"""
+    draft = event.draft
+    main_phase = draft.pick_num < draft.num_picks * len(draft.drafter_names)
+    skipped_drafters = list(draft.current_drafters)
+    if main_phase:
+        skipped_drafters.remove(draft.current_drafter_user)
+
+    roll = rng.random()
+    if not main_phase or (skipped_drafters and rng.random() < script.late_pick_rate):
+        result.late_picks += 1
+        return await click_random_team(draft, rng.choice(skipped_drafters), rng, result)
+    elif roll < script.skip_rate:
+        await draft.skip_button.callback(FakeInteraction(event.channel, draft.draft_interaction.client, event.admin))
+        result.skips += 1
+    elif roll < script.skip_rate + script.timeout_rate:
+        draft.pick_cutoff.set_result(True)
+        result.timeouts += 1
+    else:
+        return await click_random_team(draft, draft.current_drafter_user, rng, result)
+    return None
+
+
+async def click_random_team(draft: BenchDraft, drafter: FakeMember, rng: random.Random, result: DraftResult) -> int:
+    team_num = rng.choice(draft.teams_left.available_teams())
+    button = draft.grid.team_buttons[team_num]
+    await button.callback(FakeInteraction(draft.draft_channel, draft.draft_interaction.client, drafter))
+    result.picks += 1
+    return team_num
+
+
+async def run_benchmark(args: argparse.Namespace):
+    rng = random.Random(args.seed)
+    stats = ApiStats()
+    discord_latency = Latency(args.discord_latency, args.discord_latency / 2, random.Random(args.seed + 1))
+    sheets_latency = Latency(args.sheets_latency, args.sheets_latency / 2, random.Random(args.seed + 2))
+    if not args.rate_limits:
+        outbound_queue.set_rate_limits(10 ** 6, 1.0, 10 ** 6)
+    else:
+        outbound_queue.set_rate_limits(CHANNEL_BUCKET_CAPACITY, CHANNEL_BUCKET_PERIOD, GLOBAL_REQUESTS_PER_SECOND)
+
+    spreadsheet = FakeSpreadsheet()
+    sheets = AsyncSheets(lambda: FakeSheetsClient(spreadsheet, stats, sheets_latency))
+    bot = FakeBot(os.path.join(args.work_dir, 'draft_state.db'))
+    guild = FakeGuild()
+    script = DraftScript(skip_rate=args.skip_rate, timeout_rate=args.timeout_rate, late_pick_rate=args.late_pick_rate,
+                         think_time=args.think_time)
+
+    setup_start = time.perf_counter()
+    events = [await create_event(event_num, args.drafters, args.teams, args.rounds, guild, bot, spreadsheet, sheets,
+                                 stats, discord_latency, args.journal_flush_delay, args.compact_picker)
+              for event_num in range(args.drafts)]
+    setup_time = time.perf_counter() - setup_start
+
+    lag_monitor = LoopLagMonitor()
+    lag_monitor.start()
+    draft_start = time.perf_counter()
+    draft_tasks = [asyncio.create_task(event.draft.run_draft()) for event in events]
+    results = await asyncio.gather(*[drive_draft(event, draft_task, script, rng)
+                                     for event, draft_task in zip(events, draft_tasks)])
+    while len(outbound_queue):  # Let the queued edits and deletes finish
+        await asyncio.sleep(DRIVER_POLL_INTERVAL)
+    draft_time = time.perf_counter() - draft_start
+    await lag_monitor.stop()
+    sheets.shutdown()
+    bot.draft_states.close()
+
+    picks = sum(result.picks for result in results)
+    latencies = [latency for result in results for latency in result.pick_latencies]
+    print(f"{args.drafts} drafts x {args.drafters} drafters x {args.rounds} rounds, {args.teams} teams, "
+          f"discord latency {args.discord_latency * 1000:.0f}ms, sheets latency {args.sheets_latency * 1000:.0f}ms")
+    print(f"setup {setup_time:.3f}s, drafts {draft_time:.3f}s, {picks} picks "
+          f"({sum(r.late_picks for r in results)} late), {sum(r.skips for r in results)} skips, "
+          f"{sum(r.timeouts for r in results)} timeouts")
+    print(f"action to next turn p50 {percentile(latencies, 50) * 1000:.2f}ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.2f}ms")
+    print(lag_monitor.summary())
+    print(f"{stats.total()} API calls ({stats.total() / max(picks, 1):.2f} per pick):")
+    for kind, count in sorted(stats.calls.items()):
+        print(f"  {kind:<22} {count}")
+    print(f"view payloads {stats.view_payload_bytes / 1024:.1f}KB ({stats.view_payload_bytes / max(picks, 1):.0f} bytes per pick)")
+    print(f"{'hot path timings':<34} {'count':>7} {'p50':>11} {'p99':>11}")
+    for line in metrics.registry.summary():
+        print(f"  {line}")
+    for event, result in zip(events, results):
+        drafted = sum(1 for picks in event.draft.draft_picks.values() for pick in picks if pick is not None)
+        assert drafted == args.drafters * args.rounds, f"{event.event_id} only drafted {drafted} teams"
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Simulates drafts against fake Discord and Sheets backends")
+    parser.add_argument("--drafts", type=int, default=1)
+    parser.add_argument("--drafters", type=int, default=8)
+    parser.add_argument("--teams", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--discord-latency", type=float, default=0.0, help="Mean seconds per Discord call")
+    parser.add_argument("--sheets-latency", type=float, default=0.0, help="Mean seconds per Sheets call")
+    parser.add_argument("--skip-rate", type=float, default=0.1)
+    parser.add_argument("--timeout-rate", type=float, default=0.05)
+    parser.add_argument("--late-pick-rate", type=float, default=0.5)
+    parser.add_argument("--think-time", type=float, default=0.0, help="Max seconds a drafter waits before acting")
+    parser.add_argument("--journal-flush-delay", type=float, default=JOURNAL_FLUSH_DELAY)
+    parser.add_argument("--rate-limits", action='store_true', help="Pace Discord calls like the real bot does")
+    parser.add_argument("--compact-picker", action='store_true', help="One message of select menus instead of the grid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--debug", action='store_true')
+    return parser
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING)
+    with tempfile.TemporaryDirectory() as work_dir:
+        args.work_dir = work_dir
+        os.chdir(work_dir)  # Pick journals are written relative to the working directory
+        asyncio.run(run_benchmark(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import asyncio
+import datetime
+import heapq
+import itertools
+import logging
+import typing
+
+MAX_SCHEDULER_SLEEP = 300  # Seconds, re-checks the wall clock at least this often in case it jumped
+
+logger = logging.getLogger('fantasy_first')
+
+DeadlineCallback = typing.Callable[[], typing.Optional[typing.Awaitable]]
+
+
+class ScheduledDeadline:
+    """Handle for a scheduled callback, used to cancel it"""
+
+    def __init__(self, when: datetime.datetime, callback: DeadlineCallback):
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class DeadlineScheduler:
+    """Process-wide heap of absolute deadlines shared by every draft
+
+    A single task sleeps until the earliest deadline, so drafts waiting on a pick cost nothing until one of their
+    deadlines actually comes up.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, ScheduledDeadline]] = []
+        self._counter = itertools.count()  # Keeps deadlines with the same time in the order they were scheduled
+        self._wake: asyncio.Event = None
+        self._task: asyncio.Task = None
+        self._callback_tasks: set[asyncio.Task] = set()
+
+    def schedule(self, when: datetime.datetime, callback: DeadlineCallback) -> ScheduledDeadline:
+        """Calls callback at the given time, or as soon as possible if it has already passed"""
+        scheduled = ScheduledDeadline(when, callback)
+        heapq.heappush(self._heap, (when.timestamp(), next(self._counter), scheduled))
+        self._ensure_running()
+        if self._heap[0][2] is scheduled:  # New earliest deadline, the runner needs to wake up sooner
+            self._wake.set()
+        return scheduled
+
+    def reschedule(self, scheduled: ScheduledDeadline, when: datetime.datetime) -> ScheduledDeadline:
+        scheduled.cancel()
+        return self.schedule(when, scheduled.callback)
+
+    def __len__(self):
+        return sum(1 for _, _, scheduled in self._heap if not scheduled.cancelled)
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            # Drop cancelled deadlines from the top so they never cause a wakeup
+            while self._heap and self._heap[0][2].cancelled:
+                heapq.heappop(self._heap)
+
+            now = datetime.datetime.now().timestamp()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, scheduled = heapq.heappop(self._heap)
+                if not scheduled.cancelled:
+                    self._fire(scheduled)
+
+            self._wake.clear()
+            if not self._heap:
+                await self._wake.wait()
+                continue
+
+            timeout = min(self._heap[0][0] - now, MAX_SCHEDULER_SLEEP)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _fire(self, scheduled: ScheduledDeadline):
+        try:
+            result = scheduled.callback()
+        except Exception:
+            logger.exception("Deadline callback for %s failed", scheduled.when)
+            return
+        if asyncio.iscoroutine(result):
+            # Run async callbacks on their own so a slow Discord call can't hold up other drafts' deadlines
+            task = asyncio.create_task(result)
+            self._callback_tasks.add(task)
+            task.add_done_callback(self._callback_done)
+
+    def _callback_done(self, task: asyncio.Task):
+        self._callback_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Deadline callback failed: %r", task.exception())
+
+
+deadline_scheduler = DeadlineScheduler()
@@ -0,0 +1,1049 @@
+import asyncio
+import datetime
+import functools
+import itertools
+import logging
+import os
+import time
+import typing
+import zoneinfo
+from dataclasses import dataclass, field
+
+import discord
+import pygsheets
+from discord.ext import commands
+
+import metrics
+from deadline_scheduler import ScheduledDeadline, deadline_scheduler
+from draft_state import DraftState, DraftStateStore
+from log_setup import draft_log_context
+from member_index import MemberIndex
+from message_tracker import MessageTracker, delete_messages
+from outbound_queue import Priority, channel_bucket, outbound_queue, user_bucket
+from pick_deadlines import compute_pick_deadlines
+from pick_journal import PickJournal
+from pick_table import PickTableRenderer
+from sheet_access import AsyncWorksheet, a1_range
+from team_availability import TeamAvailability
+from team_search import TeamSearchIndex
+from wishlist import Wishlist
+
+# Constants based on event spreadsheet template
+DRAFTER_COL = 10
+DRAFT_FIRST_ROW = 5
+MAX_NUM_DRAFTERS = 8
+TEAMS_COL = 2
+TEAMS_FIRST_ROW = 4
+TEAM_NAME_COL = 3
+MAX_NUM_TEAMS = 100
+EVENT_ID_CELL = 'C2'
+DRAFT_END_TIME_CELL = 'E2'
+ACTIVE_HOURS_START_TIME_CELL = 'O3'
+ACTIVE_HOURS_END_TIME_CELL = 'P3'
+MAX_DISCORD_SELECTORS = 25
+MAX_VIEW_ROWS = 5
+MAX_OPTION_LABEL_LENGTH = 100
+COMPACT_PICKER_MAX_STALE = 8  # Picked teams the compact picker keeps listing before its message is edited
+
+ADMIN_ROLE_NAME = "bot admin"
+PICK_JOURNAL_DIR = 'journals'
+DRAFT_TIMEZONE = zoneinfo.ZoneInfo("America/New_York")
+
+# Date/Time Constants
+ACTIVE_HOURS_START_TIME = datetime.time(hour=10)
+ACTIVE_HOURS_END_TIME = datetime.time(hour=22)
+# Based on https://developers.google.com/sheets/api/reference/rest/v4/DateTimeRenderOption
+SHEETS_SERIAL_NUMBER_DATETIME_START = datetime.datetime(1899, 12, 30, tzinfo=DRAFT_TIMEZONE)
+
+PICK_DEADLINE_SNAP_INTERVAL = 15  # Snaps picks to 15 min intervals, ex. 3:08 -> 3:15
+PICK_REMINDERS = [(datetime.timedelta(hours=2), "You should pick within the next 2 hours for {}!"),
+                  (datetime.timedelta(minutes=30), "You should pick within the next 30 minutes for {}!"),
+                  (datetime.timedelta(0), "Your soft deadline has passed for {}, please pick ASAP!")]
+AUTO_SKIP_AFTER_DEADLINE: datetime.timedelta | None = None  # None keeps deadlines soft, drafters are never auto skipped
+NUM_PICKS = 3
+
+
+logger = logging.getLogger('fantasy_first')
+
+click_order = itertools.count()  # Order team buttons were clicked in, so competing picks apply first come first served
+
+
+def sheets_serial_to_datetime(serial_number: float) -> datetime.datetime:
+    return (SHEETS_SERIAL_NUMBER_DATETIME_START + datetime.timedelta(days=serial_number)).astimezone(DRAFT_TIMEZONE)
+
+
+def sheets_serial_to_time(serial_number, default: datetime.time) -> datetime.time:
+    """Time of day from a serial number's fractional day, ex. 0.5 -> 12:00"""
+    if not isinstance(serial_number, (int, float)):
+        return default
+    seconds = round((serial_number % 1) * 24 * 60 * 60)
+    return datetime.time(hour=seconds // 3600 % 24, minute=(seconds % 3600) // 60, second=seconds % 60)
+
+
+def drafters_range(event_page: AsyncWorksheet | pygsheets.Worksheet, num_picks: int = NUM_PICKS) -> str:
+    """A1 range of the drafter names and their pick cells"""
+    return a1_range(event_page.title, (DRAFT_FIRST_ROW, DRAFTER_COL),
+                    (DRAFT_FIRST_ROW + MAX_NUM_DRAFTERS, DRAFTER_COL + num_picks * 2))
+
+
+def parse_drafter_rows(drafter_rows: list[list], num_picks: int = NUM_PICKS) -> tuple[list[str], list[list[None | int]]]:
+    """Drafter names and their picks, draft_cells[drafter_idx][round_num] being None if not picked yet
+
+    Drafter idx N is sheet row DRAFT_FIRST_ROW + N for reads and writes, so a blank row between drafters is an error
+    instead of being skipped.
+    """
+    drafter_names = []
+    draft_cells = []
+    blank_row = None
+    for row_offset, row in enumerate(drafter_rows):
+        if not row or row[0] == '':
+            if blank_row is None:
+                blank_row = DRAFT_FIRST_ROW + row_offset
+            continue
+        if blank_row is not None:
+            raise LookupError(f"Drafter row {blank_row} is blank but row {DRAFT_FIRST_ROW + row_offset} has a drafter, "
+                              f"remove the gap from the drafter list")
+        drafter_names.append(str(row[0]))
+        # Pick cells are every other column after the drafter's name
+        picks = [row[1 + round_num * 2] if 1 + round_num * 2 < len(row) else '' for round_num in range(num_picks)]
+        draft_cells.append([None if pick == '' else pick for pick in picks])
+    return drafter_names, draft_cells
+
+
+@dataclass
+class EventPageSnapshot:
+    """Everything a draft needs from an event page, read in a single batched request"""
+    teams: list[int]
+    team_name_dict: dict[int, str]
+    draft_end_datetime: datetime.datetime
+    drafter_names: list[str]
+    # draft_cells[drafter_idx][round_num] is the picked team number, or None if not picked yet
+    draft_cells: list[list[None | int]] = field(default_factory=list)
+    active_hours_start_time: datetime.time = ACTIVE_HOURS_START_TIME
+    active_hours_end_time: datetime.time = ACTIVE_HOURS_END_TIME
+
+    @classmethod
+    async def load(cls, event_page: AsyncWorksheet, num_picks: int = NUM_PICKS) -> 'EventPageSnapshot':
+        teams_range = event_page.range((TEAMS_FIRST_ROW, TEAMS_COL), (TEAMS_FIRST_ROW + MAX_NUM_TEAMS, TEAM_NAME_COL))
+        draft_end_range = event_page.range(DRAFT_END_TIME_CELL)
+        drafter_range = drafters_range(event_page, num_picks)
+        active_hours_range = event_page.range(ACTIVE_HOURS_START_TIME_CELL, ACTIVE_HOURS_END_TIME_CELL)
+
+        team_rows, draft_end_rows, drafter_rows, active_hours_rows = await event_page.sheets.get_ranges(
+            event_page.spreadsheet_id, [teams_range, draft_end_range, drafter_range, active_hours_range],
+            value_render=pygsheets.ValueRenderOption.UNFORMATTED_VALUE)
+        return cls.parse(team_rows, draft_end_rows, drafter_rows, active_hours_rows, num_picks)
+
+    @classmethod
+    def parse(cls, team_rows: list[list], draft_end_rows: list[list], drafter_rows: list[list],
+              active_hours_rows: list[list], num_picks: int = NUM_PICKS) -> 'EventPageSnapshot':
+        teams = []
+        team_name_dict = {}
+        for row in team_rows:
+            if not row or row[0] == '':
+                continue
+            teams.append(row[0])
+            team_name_dict[row[0]] = row[1] if len(row) > 1 else ''
+
+        if not draft_end_rows or not draft_end_rows[0]:
+            raise LookupError(f"Draft end time ({DRAFT_END_TIME_CELL}) is not set on the event page")
+        draft_end_datetime = sheets_serial_to_datetime(draft_end_rows[0][0])
+
+        drafter_names, draft_cells = parse_drafter_rows(drafter_rows, num_picks)
+
+        active_hours = active_hours_rows[0] if active_hours_rows else []
+        active_hours_start_time = sheets_serial_to_time(active_hours[0] if len(active_hours) > 0 else None,
+                                                        ACTIVE_HOURS_START_TIME)
+        active_hours_end_time = sheets_serial_to_time(active_hours[1] if len(active_hours) > 1 else None,
+                                                      ACTIVE_HOURS_END_TIME)
+
+        return cls(teams=teams, team_name_dict=team_name_dict, draft_end_datetime=draft_end_datetime,
+                   drafter_names=drafter_names, draft_cells=draft_cells,
+                   active_hours_start_time=active_hours_start_time, active_hours_end_time=active_hours_end_time)
+
+
+class EventDraft:
+    def __init__(self, event_id: str, event_page: AsyncWorksheet, draft_interaction: discord.Interaction):
+        self.current_msgs = MessageTracker(outbound_queue)
+        self.draft_interaction = draft_interaction
+        self.draft_channel: discord.TextChannel = draft_interaction.channel
+        self.member_index: MemberIndex = draft_interaction.client.member_index
+        self.draft_states: DraftStateStore = draft_interaction.client.draft_states
+        logger.debug("Initializing draft in channel %s using sheet page %s", self.draft_channel.name, event_page.title)
+        self.event_page = event_page
+        self.event_id = event_id
+        self.all_teams: list[int] = []
+        self.teams_left = TeamAvailability([])
+        self.team_name_dict: dict[int, str] = {}
+        self.draft_end_datetime: datetime.datetime = None
+        self.drafter_names: list[str] = []
+        self.draft_picks: dict[str, list[None | str]] = {}
+        self.num_picks = NUM_PICKS
+        self.snapshot: EventPageSnapshot = None
+        self.active_hours_start_time = ACTIVE_HOURS_START_TIME
+        self.active_hours_end_time = ACTIVE_HOURS_END_TIME
+        self.pick_num = 0
+        self.pick_journal = PickJournal(event_page, os.path.join(PICK_JOURNAL_DIR, f"{event_id}.jsonl"))
+        self.current_drafter_user: discord.Member = None
+        self.stop_future = asyncio.get_event_loop().create_future()
+        self.skip_button = SkipButton(self)
+        self.draft_start_time = None
+        self.reminder_msgs = []
+        self.pick_deadline_handles: list[ScheduledDeadline] = []
+
+        # Draft progress, saved to the draft state store as it changes
+        self.restored_state: DraftState = None
+        self.pick_deadlines: dict[int, datetime.datetime] = {}  # Keyed by overall pick number
+        self.last_added_pick_num = -1
+        self.num_teams_drafted = 0
+        self.current_drafters: list[discord.Member] = []  # Shared with the grid's buttons
+        self.draft_pick_msgs: dict[int, discord.Message | discord.PartialMessage] = {}
+        self.pick_table: PickTableRenderer = None
+        self.pick_table_msg: discord.Message | discord.PartialMessage = None
+        self.skip_button_msg: discord.Message | discord.PartialMessage = None
+        self.skipped_picker_msg: discord.Message | discord.PartialMessage = None
+        self.grid: ButtonGrid = None
+        self.grid_msgs: list[discord.Message | discord.PartialMessage] = []
+        self.wishlists: dict[str, Wishlist] = {}  # Keyed by drafter nickname
+        self.compact_picker = False  # Select menus in one message instead of the button grid
+        self.team_search_index: TeamSearchIndex = None
+
+    @classmethod
+    async def create(cls, event_id: str, event_page: AsyncWorksheet, draft_interaction: discord.Interaction,
+                     compact_picker: bool = False):
+        draft = cls(event_id, event_page, draft_interaction)
+        draft.compact_picker = compact_picker
+        await draft.load_event_page()
+        return draft
+
+    @classmethod
+    def resume(cls, event_id: str, event_page: AsyncWorksheet, draft_interaction: discord.Interaction,
+               saved_state: DraftState):
+        """Rebuilds a draft from its saved state, without reading the sheet"""
+        draft = cls(event_id, event_page, draft_interaction)
+        draft.restore_state(saved_state)
+        return draft
+
+    async def load_event_page(self):
+        load_start = time.perf_counter()
+        self.snapshot = await EventPageSnapshot.load(self.event_page, self.num_picks)
+        logger.debug("Loaded %s snapshot in %.3fs", self.event_page.title, time.perf_counter() - load_start)
+
+        # Picks that were journaled but not yet written to the sheet before a restart
+        for (row, col), picked_team_num in self.pick_journal.load().items():
+            self.snapshot.draft_cells[row - DRAFT_FIRST_ROW][(col - DRAFTER_COL - 1) // 2] = picked_team_num
+
+        self.draft_end_datetime = self.snapshot.draft_end_datetime
+        self.active_hours_start_time = self.snapshot.active_hours_start_time
+        self.active_hours_end_time = self.snapshot.active_hours_end_time
+        self.all_teams = list(self.snapshot.teams)
+        self.teams_left = TeamAvailability(self.snapshot.teams)
+        self.team_name_dict = dict(self.snapshot.team_name_dict)
+        self.drafter_names = list(self.snapshot.drafter_names)
+        for name in self.drafter_names:
+            if self.find_drafter(name) is None:
+                raise LookupError(f"User \"{name}\" not found in current draft channel, cannot create draft")
+            self.draft_picks[name] = [None] * self.num_picks
+
+    def restore_state(self, state: DraftState):
+        self.restored_state = state
+        self.pick_journal.load()  # Only to pick back up flushing, the saved picks already include these
+        self.all_teams = list(state.all_teams)
+        self.teams_left = TeamAvailability(state.all_teams)
+        self.team_name_dict = dict(state.team_name_dict)
+        self.drafter_names = list(state.drafter_names)
+        self.compact_picker = state.compact_picker
+        self.draft_picks = {name: list(picks) for name, picks in state.draft_picks.items()}
+        for picks in self.draft_picks.values():
+            for picked_team_num in picks:
+                if picked_team_num is not None:
+                    self.teams_left.pick(picked_team_num)
+        self.draft_start_time = state.draft_start_time
+        self.draft_end_datetime = state.draft_end_datetime
+        self.pick_deadlines = dict(state.pick_deadlines)
+        self.pick_num = state.pick_num
+        self.last_added_pick_num = state.last_added_pick_num
+        self.num_teams_drafted = state.num_teams_drafted
+        for name in self.drafter_names:
+            if self.find_drafter(name) is None:
+                raise LookupError(f"User \"{name}\" not found in current draft channel, cannot resume draft")
+        self.current_drafters.extend([self.find_drafter(name) for name in state.current_drafters])
+
+    def save_state(self, action: str = None, drafter: str = None, round_num: int = None, team_num: int = None):
+        self.draft_states.save(self.current_state(), action, drafter, round_num, team_num)
+
+    def current_state(self) -> DraftState:
+        return DraftState(
+            event_id=self.event_id,
+            channel_id=self.draft_channel.id,
+            all_teams=self.all_teams,
+            team_name_dict=self.team_name_dict,
+            drafter_names=self.drafter_names,
+            draft_picks=self.draft_picks,
+            draft_start_time=self.draft_start_time,
+            draft_end_datetime=self.draft_end_datetime,
+            pick_deadlines=self.pick_deadlines,
+            pick_num=self.pick_num,
+            last_added_pick_num=self.last_added_pick_num,
+            num_teams_drafted=self.num_teams_drafted,
+            current_drafters=[drafter.nick for drafter in self.current_drafters],
+            draft_pick_msg_ids={pick_num: msg.id for pick_num, msg in self.draft_pick_msgs.items()},
+            pick_table_msg_id=self.pick_table_msg.id if self.pick_table_msg else None,
+            skip_button_msg_id=self.skip_button_msg.id if self.skip_button_msg else None,
+            skipped_picker_msg_id=self.skipped_picker_msg.id if self.skipped_picker_msg else None,
+            grid_msg_ids=[msg.id for msg in self.grid_msgs],
+            tracked_msg_ids=[msg.id for msg in self.current_msgs],
+            compact_picker=self.compact_picker,
+        )
+
+    async def run_draft(self):
+        draft_log_context.set(self)  # Tags this task's log records with the event and pick
+        self.pick_journal.start()
+        try:
+            if self.restored_state is None:
+                if not await self.start_draft_messages():
+                    return
+            else:
+                await self.reattach_draft_messages()
+            self.wishlists = {drafter: Wishlist(teams)
+                              for drafter, teams in self.draft_states.load_wishlists(self.event_id).items()}
+            await self.run_draft_loop()
+            # Finished or stopped, a crash leaves the state behind to resume from
+            self.draft_states.delete(self.event_id)
+        finally:
+            self.cancel_pick_deadline()
+            await self.pick_journal.close()
+
+    def build_picker(self) -> 'ButtonGrid':
+        picker_cls = CompactPicker if self.compact_picker else ButtonGrid
+        return picker_cls(teams_list=self.all_teams, teams_left=self.teams_left, current_drafters=self.current_drafters,
+                          team_name_dict=self.team_name_dict, custom_id_prefix=self.event_id)
+
+    def search_teams(self, text: str) -> list[int]:
+        """Available teams matching the start of a team number or name, for /pick autocomplete"""
+        if self.team_search_index is None:
+            self.team_search_index = TeamSearchIndex(self.team_name_dict)
+        return self.team_search_index.search(text, self.teams_left)
+
+    def build_pick_table(self) -> PickTableRenderer:
+        num_drafters = len(self.drafter_names)
+        pick_table = PickTableRenderer(self.drafter_names, self.num_picks)
+        for pick_idx in range(self.num_picks * num_drafters):
+            round_num = pick_idx // num_drafters
+            drafter_idx = pick_idx % num_drafters
+            if round_num % 2 == 1:
+                drafter_idx = (num_drafters - 1) - drafter_idx
+            drafter_name = self.drafter_names[drafter_idx]
+
+            if self.draft_picks[drafter_name][round_num]:
+                pick_table.set_pick(drafter_name, round_num, self.draft_picks[drafter_name][round_num])
+            elif pick_idx in self.pick_deadlines:
+                pick_table.set_deadline(drafter_name, round_num, self.pick_deadlines[pick_idx])
+        return pick_table
+
+    async def start_draft_messages(self) -> bool:
+        """Scans the pre-picked teams, computes deadlines and posts the draft messages, returning False if the
+        deadline has already passed"""
+        num_drafters = len(self.drafter_names)
+
+        picked_teams = []
+
+        self.draft_start_time = datetime.datetime.now().astimezone().astimezone(DRAFT_TIMEZONE)  # TODO Deal with timezones
+        if (self.draft_start_time > self.draft_end_datetime):
+            # Draft started after deadline, invalid
+            await self.send_status(f"Deadline for **{self.event_id}** has passed ({self.draft_end_datetime.strftime('%a. %b %d %Y %I:%M%p')})", ephemeral=True)
+            return False
+
+        await self.send_status(f'Starting Fantasy FIRST draft for event **{self.event_id}**')
+
+        start_pick = None
+        open_pick_nums = []
+        for scan_pick in range(self.num_picks * num_drafters):
+            round_num = scan_pick // num_drafters
+            drafter_idx = scan_pick % num_drafters
+
+            # If it is a reverse order round
+            if round_num % 2 == 1:
+                drafter_idx = (num_drafters - 1) - drafter_idx
+            drafter_name = self.drafter_names[drafter_idx]
+            picked_team_num = self.snapshot.draft_cells[drafter_idx][round_num]
+            if picked_team_num is None:
+                if start_pick is None:
+                    start_pick = scan_pick
+                open_pick_nums.append(scan_pick)
+                logger.debug("Blank, %s %s %s", picked_team_num, start_pick, scan_pick)
+                continue
+            self.teams_left.pick(picked_team_num)
+            self.draft_picks[drafter_name][round_num] = picked_team_num
+            picked_teams.append(picked_team_num)
+
+        logger.info("Pre-picked teams: %s %s", start_pick, self.draft_picks)
+        deadline_schedule = compute_pick_deadlines(
+            self.draft_start_time, self.draft_end_datetime, len(open_pick_nums), DRAFT_TIMEZONE,
+            (self.active_hours_start_time, self.active_hours_end_time), PICK_DEADLINE_SNAP_INTERVAL)
+        self.draft_end_datetime = deadline_schedule.draft_end
+        time_per_pick = deadline_schedule.time_per_pick
+        self.pick_deadlines = dict(zip(open_pick_nums, deadline_schedule.deadlines))
+        logger.debug("Total draft time %s | %s", deadline_schedule.total_draft_time, deadline_schedule.day_lengths)
+
+        logger.debug("Deadlines: %s", deadline_schedule.deadlines)
+
+        time_msg_str = f"Draft Start Time: {self.draft_start_time.strftime('%a. %b %d %I:%M%p')}\n"
+        time_msg_str += f"Draft End Time: {self.draft_end_datetime.strftime('%a. %b %d %I:%M%p')}\n"
+        time_msg_str += f"Minimum Time Limit per Pick:  {(str(time_per_pick.days) + 'd ') if time_per_pick.days > 0 else ''}{time_per_pick.seconds // 3600}hr {(time_per_pick.seconds % 3600) // 60:0>2}min\n"
+
+        self.pick_table = self.build_pick_table()
+
+        logger.info("Draft times:\n%s", time_msg_str)
+        time_msg = await self.send(time_msg_str)
+        self.current_msgs.append(time_msg)
+        logger.debug("Pick table:\n%s", self.pick_table.render())
+
+        teams_left_str = "Event Team List:\n" + "\n".join([f'{team_num:<4} - {self.team_name_dict[team_num]}' for team_num in self.all_teams])
+        teams_left_msg = await self.send(teams_left_str)
+        self.current_msgs.append(teams_left_msg)
+
+        self.pick_table_msg = await self.send(self.pick_table.render())
+        self.pick_table.sent_content = self.pick_table.render()
+        self.current_msgs.append(self.pick_table_msg)
+
+        skip_button_view = discord.ui.View(timeout=None)
+        skip_button_view.add_item(self.skip_button)
+        self.skip_button_msg = await self.send("", view=skip_button_view)
+        self.current_msgs.append(self.skip_button_msg)
+
+        # current_drafters is shared with the buttons, so the grid is sent once and edited in place as teams are picked
+        self.grid = self.build_picker()
+        for view in self.grid.views:
+            self.grid_msgs.append(await self.send("", view=view))
+        self.current_msgs.extend(self.grid_msgs)
+
+        self.pick_num = start_pick if start_pick is not None else self.num_picks * num_drafters
+        self.num_teams_drafted = len(picked_teams)
+        self.save_state()
+        return True
+
+    async def reattach_draft_messages(self):
+        """Points the draft at the messages it posted before the restart and re-registers their buttons, without any
+        API calls besides the reply to the command"""
+        state = self.restored_state
+        await self.send_status(f'Resuming Fantasy FIRST draft for event **{self.event_id}** '
+                               f'({self.num_teams_drafted}/{self.num_picks * len(self.drafter_names)} picks made)')
+
+        partial_msgs: dict[int, discord.PartialMessage] = {}
+
+        def partial_msg(msg_id: int | None) -> discord.PartialMessage | None:
+            if msg_id is None:
+                return None
+            if msg_id not in partial_msgs:
+                partial_msgs[msg_id] = self.draft_channel.get_partial_message(msg_id)
+            return partial_msgs[msg_id]
+
+        self.current_msgs.extend([partial_msg(msg_id) for msg_id in state.tracked_msg_ids])
+        self.draft_pick_msgs = {pick_num: partial_msg(msg_id) for pick_num, msg_id in state.draft_pick_msg_ids.items()}
+        self.pick_table_msg = partial_msg(state.pick_table_msg_id)
+        self.skipped_picker_msg = partial_msg(state.skipped_picker_msg_id)
+        self.skip_button_msg = partial_msg(state.skip_button_msg_id)
+        self.grid_msgs = [partial_msg(msg_id) for msg_id in state.grid_msg_ids]
+
+        # The table message is edited on the next pick, the first edit after a restart always goes through
+        self.pick_table = self.build_pick_table()
+
+        # Buttons have fixed custom IDs, so new views can take over the interactions of the posted ones
+        bot: commands.Bot = self.draft_interaction.client
+        if self.skip_button_msg is not None:
+            skip_button_view = discord.ui.View(timeout=None)
+            skip_button_view.add_item(self.skip_button)
+            bot.add_view(skip_button_view, message_id=self.skip_button_msg.id)
+        self.grid = self.build_picker()
+        for view, grid_msg in zip(self.grid.views, self.grid_msgs):
+            bot.add_view(view, message_id=grid_msg.id)
+        logger.info("Resumed %s at pick %s with %s live messages", self.event_id, self.pick_num, len(self.current_msgs))
+
+    async def run_draft_loop(self):
+        num_drafters = len(self.drafter_names)
+        grid = self.grid
+        grid_msgs = self.grid_msgs
+        current_drafters = self.current_drafters
+        draft_pick_msgs = self.draft_pick_msgs
+        pick_table = self.pick_table
+
+        logger.debug("Starting draft at pick %s", self.pick_num)
+        # Draft Loop
+        while self.pick_num < self.num_picks * num_drafters:
+            round_num = self.pick_num // num_drafters
+            drafter_idx = self.pick_num % num_drafters
+            if round_num % 2 == 1:
+                drafter_idx = (num_drafters - 1) - drafter_idx
+            drafter_name = self.drafter_names[drafter_idx]
+            if self.draft_picks[drafter_name][round_num] is not None:
+                self.pick_num += 1
+                continue
+
+            deadline = self.pick_deadlines[self.pick_num]
+
+            self.current_drafter_user = self.find_drafter(drafter_name)
+            if self.last_added_pick_num != self.pick_num:
+                current_drafters.append(self.current_drafter_user)
+                self.last_added_pick_num = self.pick_num
+            logger.debug("Current drafters: %s", current_drafters)
+            # A drafter with a wishlist has their pick made right away instead of being pinged and waited on
+            autodraft = next(self.wishlist_teams(drafter_name), None) is not None
+            # A resumed draft already pinged the current drafter
+            if self.pick_num not in draft_pick_msgs:
+                if autodraft:
+                    pick_msg_content = f'{self.current_drafter_user.nick} is picking from their wishlist'
+                else:
+                    pick_msg_content = f'Current drafter is {self.current_drafter_user.mention}, deadline is **{deadline.strftime("%a. %b %d %I:%M%p")}**'
+                draft_pick_msgs[self.pick_num] = await self.send(pick_msg_content, Priority.URGENT)
+
+                self.current_msgs.append(draft_pick_msgs[self.pick_num])
+                self.save_state()
+
+            grid.reset_futures()
+
+            grid.callback_futures.append(self.stop_future)
+            cutoff = self.schedule_pick_deadline(deadline)
+            grid.callback_futures.append(cutoff)
+            grid.callback_futures.append(self.skip_button.skip_future)
+            if autodraft:
+                self.autodraft_waiting_picks(drafter_name)
+
+            # Wait for value from one of the team pickers' callback
+            done, pending = await asyncio.wait(grid.callback_futures, return_when=asyncio.FIRST_COMPLETED)
+
+            action_start = time.perf_counter()
+            self.cancel_pick_deadline()
+            # Delete pick deadline reminder messages, a reminder still being sent gets deleted once it arrives
+            reminder_msgs, self.reminder_msgs = self.reminder_msgs, []
+            if reminder_msgs:
+                outbound_queue.post(Priority.BACKGROUND, user_bucket(self.current_drafter_user),
+                                    functools.partial(delete_messages, reminder_msgs))
+
+            logger.debug("Keys: %s", draft_pick_msgs.keys())
+
+            if self.stop_future in done:
+                logger.info("Stopping draft")
+
+                # TODO Add cleanup function
+                await self.cleanup_messages()
+                cutoff.cancel()
+                return
+            elif self.skip_button.skip_future in done:
+                logger.info("Skipping %s", drafter_name)
+                cutoff.cancel()
+                self.skip_button.reset_future()
+
+                self.post_edit(draft_pick_msgs[self.pick_num], Priority.URGENT,
+                               content=f'{self.current_drafter_user.nick}\'s #{round_num + 1} pick was skipped but they may still pick')
+
+                self.pick_num += 1
+                self.save_state('skip', drafter_name, round_num)
+                action = 'skip'
+
+            # If automatic cutoff happened
+            elif cutoff in done:
+                logger.info("Timeout skipping %s", self.current_drafter_user.nick)
+                outbound_queue.post(Priority.URGENT, channel_bucket(self.draft_channel), functools.partial(
+                    self.draft_channel.send, f"Time is up, {self.current_drafter_user.nick}! Allowing next drafter to pick", delete_after=300))
+
+                self.skip_button.reset_future()
+
+                self.post_edit(draft_pick_msgs[self.pick_num], Priority.URGENT,
+                               content=f'{self.current_drafter_user.nick}\'s #{round_num + 1} pick was skipped but they may still pick')
+                self.pick_num += 1
+                self.save_state('timeout', drafter_name, round_num)
+                action = 'timeout'
+
+
+            else:
+                # Team has been picked by either current or skipped drafter
+                user_picked: discord.Member
+                # The earliest click wins if several came in before the loop woke up, the rest wait for the next pass
+                picked_button = min([grid.future_buttons[future] for future in done],
+                                    key=lambda button: button.click_order)
+                picked_team_num, user_picked = picked_button.click_team_future.result()
+                cutoff.cancel()
+                logger.debug("Current drafters: %s, picker %s", current_drafters, user_picked)
+                if user_picked not in current_drafters:
+                    # Clicked a second team before their first click was applied, with no picks left for it
+                    logger.info("%s has no picks left, ignoring team %s", user_picked.nick, picked_team_num)
+                    self.ignore_click(picked_button)
+                    metrics.draft_action_seconds.labels('ignored_pick').observe(time.perf_counter() - action_start)
+                    continue
+                current_drafters.remove(user_picked)
+                self.num_teams_drafted += 1
+
+                draft_pick_round_idx = self.draft_picks[user_picked.nick].index(None) # TODO May be unnecessarily complex for common case of current drafter picking
+                replaced_pick_msg = None
+                if user_picked == self.current_drafter_user and draft_pick_round_idx == round_num:  # Current drafter
+                    draft_pick_drafter_idx = drafter_idx
+                    draft_pick_num = self.pick_num
+                    logger.debug("Current drafter picked %s %s %s", draft_pick_drafter_idx, draft_pick_num, draft_pick_round_idx)
+                else:  # Skipped drafter
+                    draft_pick_drafter_idx = self.drafter_names.index(user_picked.nick)
+                    draft_pick_drafter_idx_pick_num = draft_pick_drafter_idx
+                    if draft_pick_round_idx % 2 == 1:
+                        draft_pick_drafter_idx_pick_num = (num_drafters - 1) - draft_pick_drafter_idx_pick_num
+                    draft_pick_num = draft_pick_round_idx * num_drafters + draft_pick_drafter_idx_pick_num  # TODO Maybe could be replaced/removed
+                    logger.debug("Skipped drafter picked %s %s %s %s", draft_pick_drafter_idx, draft_pick_num, draft_pick_round_idx,
+                                 draft_pick_drafter_idx_pick_num)
+                    # Current drafter's message is deleted so that there will not be a duplicate when they get re-pinged
+                    replaced_pick_msg = draft_pick_msgs.pop(self.pick_num)
+
+                self.current_msgs.remove(draft_pick_msgs[draft_pick_num])
+
+                logger.debug("%s picked %s", user_picked.nick, picked_team_num)
+                self.pick_journal.record((DRAFT_FIRST_ROW + draft_pick_drafter_idx, DRAFTER_COL + 1 + draft_pick_round_idx * 2),
+                                         picked_team_num)
+                self.teams_left.pick(picked_team_num)
+                self.draft_picks[user_picked.nick][draft_pick_round_idx] = picked_team_num
+                pick_table.set_pick(user_picked.nick, draft_pick_round_idx, picked_team_num)
+                if replaced_pick_msg is not None:
+                    self.current_msgs.remove(replaced_pick_msg)
+                # Saved before any Discord edits so a crash partway through them can't lose the pick
+                self.save_state('pick', user_picked.nick, draft_pick_round_idx, picked_team_num)
+
+                if replaced_pick_msg is not None:
+                    outbound_queue.post(Priority.BACKGROUND, channel_bucket(self.draft_channel),
+                                        functools.partial(delete_messages, [replaced_pick_msg]))
+
+                # TODO Maybe should be moved to be part of next drafter ping
+                self.post_edit(draft_pick_msgs[draft_pick_num], Priority.URGENT, content=f"{user_picked.nick} picked team {picked_team_num} for their #{draft_pick_round_idx + 1} pick (#{self.num_teams_drafted} overall)")
+
+                with metrics.render_seconds.labels('grid').time():
+                    changed_view_idxs = grid.refresh()
+                for view_idx in changed_view_idxs:
+                    self.post_edit(grid_msgs[view_idx], view=grid.views[view_idx])
+                self.post_pick_table_update()
+                action = 'pick'
+
+            metrics.draft_action_seconds.labels(action).observe(time.perf_counter() - action_start)
+            # TODO clean up futures
+
+            self.skip_button.reset_future()
+
+        if self.skip_button_msg is not None:
+            self.current_msgs.delete_later([self.skip_button_msg])
+            self.skip_button_msg = None
+
+        if self.num_teams_drafted < self.num_picks * num_drafters:
+            #  Still some outstanding picks that were skipped.
+            logger.debug("Current drafters: %s", current_drafters)
+            deadline = max(self.pick_deadlines.values())
+            if self.skipped_picker_msg is None:
+                self.skipped_picker_msg = await self.send(
+                    f'Skipped drafters that still need to pick are {", ".join([drafter.mention for drafter in set(current_drafters)])}, deadline is **{deadline.strftime("%a. %b %d %I:%M%p")}**', Priority.URGENT)
+
+                self.current_msgs.append(self.skipped_picker_msg)
+                self.save_state()
+
+            # Loop until remaining picks are done
+            while self.num_teams_drafted < self.num_picks * num_drafters:
+                grid.reset_futures()
+                grid.callback_futures.append(self.stop_future)
+
+                # Wait for value from one of the team pickers' callback
+                done, pending = await asyncio.wait(grid.callback_futures, return_when=asyncio.FIRST_COMPLETED)
+
+                logger.debug("Keys: %s", draft_pick_msgs.keys())
+                action_start = time.perf_counter()
+
+                if self.stop_future in done:
+                    logger.info("Stopping draft")
+
+                    await self.cleanup_messages()
+                    return
+                else:
+                    # Every pick that came in since the last pass is applied together, so a burst of skipped drafters
+                    # picking at once costs one grid update, one pick table edit and one state save
+                    picked_buttons = sorted([grid.future_buttons[future] for future in done if future is not self.stop_future],
+                                            key=lambda button: button.click_order)  # First come first served
+                    applied_picks = []
+                    pick_msg_edits = []
+                    for button in picked_buttons:
+                        # Team has been picked by a skipped drafter
+                        user_picked: discord.Member
+                        picked_team_num, user_picked = button.click_team_future.result()
+                        if user_picked not in current_drafters:
+                            # Clicked a second team before their first click was applied, with no picks left for it
+                            logger.info("%s has no picks left, ignoring team %s", user_picked.nick, picked_team_num)
+                            self.ignore_click(button)
+                            continue
+                        logger.debug("Current drafters: %s, picker %s", current_drafters, user_picked)
+                        current_drafters.remove(user_picked)
+                        self.num_teams_drafted += 1
+
+                        draft_pick_round_idx = self.draft_picks[user_picked.nick].index(None)
+
+                        draft_pick_drafter_idx = self.drafter_names.index(user_picked.nick)
+                        draft_pick_drafter_idx_pick_num = draft_pick_drafter_idx
+                        if draft_pick_round_idx % 2 == 1:
+                            draft_pick_drafter_idx_pick_num = (num_drafters - 1) - draft_pick_drafter_idx_pick_num
+                        draft_pick_num = draft_pick_round_idx * num_drafters + draft_pick_drafter_idx_pick_num  # TODO Maybe could be replaced/removed
+                        logger.debug("Skipped drafter picked %s %s %s %s", draft_pick_drafter_idx, draft_pick_num, draft_pick_round_idx,
+                                     draft_pick_drafter_idx_pick_num)
+
+                        logger.debug("%s picked %s", user_picked.nick, picked_team_num)
+
+                        # Journal writes are flushed to the sheet in one coalesced batch
+                        self.pick_journal.record((DRAFT_FIRST_ROW + draft_pick_drafter_idx, DRAFTER_COL + 1 + draft_pick_round_idx * 2),
+                                                 picked_team_num)
+                        self.teams_left.pick(picked_team_num)
+                        self.draft_picks[user_picked.nick][draft_pick_round_idx] = picked_team_num
+                        pick_table.set_pick(user_picked.nick, draft_pick_round_idx, picked_team_num)
+                        applied_picks.append(('pick', user_picked.nick, draft_pick_round_idx, picked_team_num))
+
+                        pick_msg_edits.append((draft_pick_msgs[draft_pick_num], f"{user_picked.nick} picked team {picked_team_num} for their #{draft_pick_round_idx + 1} pick (#{self.num_teams_drafted} overall)"))
+
+                    if not applied_picks:
+                        continue
+                    if len(applied_picks) > 1:
+                        logger.info("Applying %s late picks together", len(applied_picks))
+                    # Saved before the grid and table edits so a crash partway through them can't lose the picks
+                    self.draft_states.save_actions(self.current_state(), applied_picks)
+
+                    for pick_msg, content in pick_msg_edits:
+                        self.post_edit(pick_msg, Priority.URGENT, content=content)
+
+                    with metrics.render_seconds.labels('grid').time():
+                        changed_view_idxs = grid.refresh()
+                    for view_idx in changed_view_idxs:
+                        self.post_edit(grid_msgs[view_idx], view=grid.views[view_idx])
+
+                    self.post_pick_table_update()
+                    metrics.draft_action_seconds.labels('late_pick').observe(time.perf_counter() - action_start)
+
+                self.post_edit(self.skipped_picker_msg, content=f'Skipped drafters that still need to pick are {" ".join([drafter.mention for drafter in set(current_drafters)])}, deadline is **{deadline.strftime("%a. %b %d %I:%M%p")}**')
+
+            self.current_msgs.delete_later([self.skipped_picker_msg])
+
+        self.current_msgs.delete_later(grid_msgs)
+        grid_msgs.clear()
+
+        logger.info("Draft has finished!")
+        await self.send(
+            f'@everyone Draft for {self.event_page.title} has finished!\nSee completed event page below:\n{self.event_page.url}')
+
+    def find_drafter(self, drafter_name: str) -> discord.Member | None:
+        """Looks up a drafter by nickname, only matching members who can see the draft channel"""
+        for member in self.member_index.get(self.draft_channel.guild, drafter_name):
+            if self.draft_channel.permissions_for(member).read_messages:
+                return member
+        return None
+
+    async def send_status(self, content: str, ephemeral: bool = False):
+        """Replies to the command that started the draft, or posts in the channel once the interaction has expired
+        (ex. when the supervisor restarts a draft days later)"""
+        if not self.draft_interaction.is_expired():
+            await self.draft_interaction.followup.send(content=content, ephemeral=ephemeral)
+        else:
+            await self.send(content)
+
+    async def send(self, content: str, priority: Priority = Priority.NORMAL, **kwargs) -> discord.Message:
+        """Sends a message to the draft channel through the outbound queue"""
+        return await outbound_queue.submit(priority, channel_bucket(self.draft_channel),
+                                           functools.partial(self.draft_channel.send, content, **kwargs))
+
+    def post_edit(self, msg: discord.Message | discord.PartialMessage, priority: Priority = Priority.NORMAL, **kwargs):
+        """Queues an edit without waiting for it, replacing any queued edit of the same message"""
+        outbound_queue.post(priority, channel_bucket(self.draft_channel), functools.partial(msg.edit, **kwargs),
+                            coalesce_key=('edit', msg.id))
+
+    def post_pick_table_update(self):
+        outbound_queue.post(Priority.NORMAL, channel_bucket(self.draft_channel),
+                            functools.partial(self.pick_table.update_message, self.pick_table_msg),
+                            coalesce_key=('edit', self.pick_table_msg.id), operation='edit')
+
+    async def cleanup_messages(self):
+        await self.current_msgs.delete_all()
+
+    def stop_draft(self):
+        if not self.stop_future.done():
+            self.stop_future.set_result("Stop")
+
+    def is_stopped(self) -> bool:
+        return self.stop_future.done()
+
+    def schedule_pick_deadline(self, deadline: datetime.datetime) -> asyncio.Future:
+        """Schedules the current drafter's reminders, returning a future that completes if they time out"""
+        # TODO Avoid repinging when someone picks out of order after this person's deadline has passed
+        self.reminder_msgs = []
+        self.pick_deadline_handles = []
+        cutoff = asyncio.get_event_loop().create_future()
+        drafter = self.current_drafter_user
+        now = datetime.datetime.now().astimezone()
+
+        for reminder_idx, (time_before, reminder_str) in enumerate(PICK_REMINDERS):
+            # Only the latest reminder that has already passed is sent, not every one of them at once
+            next_reminder_passed = reminder_idx + 1 < len(PICK_REMINDERS) and \
+                deadline - PICK_REMINDERS[reminder_idx + 1][0] <= now
+            if next_reminder_passed:
+                continue
+            self.pick_deadline_handles.append(deadline_scheduler.schedule(
+                deadline - time_before, functools.partial(self.send_reminder, drafter, reminder_str)))
+
+        if AUTO_SKIP_AFTER_DEADLINE is not None:
+            self.pick_deadline_handles.append(deadline_scheduler.schedule(
+                deadline + AUTO_SKIP_AFTER_DEADLINE, lambda: cutoff.done() or cutoff.set_result(True)))
+        return cutoff
+
+    def cancel_pick_deadline(self):
+        for handle in self.pick_deadline_handles:
+            handle.cancel()
+        self.pick_deadline_handles.clear()
+
+    async def send_reminder(self, drafter: discord.Member, reminder_str: str):
+        reminder_msgs = self.reminder_msgs  # Replaced by a new list once the pick is over
+        reminder = await outbound_queue.submit(Priority.NORMAL, user_bucket(drafter), functools.partial(
+            drafter.send, reminder_str.format(self.event_page.title)))
+        if self.reminder_msgs is reminder_msgs:
+            reminder_msgs.append(reminder)
+        else:  # Picked while the reminder was queued or in flight, and its list was already handed off for deletion
+            outbound_queue.post(Priority.BACKGROUND, user_bucket(drafter), functools.partial(delete_messages, [reminder]))
+
+    def skip_next(self):
+        self.skip_button.skip_future.set_result(True)
+
+    def ignore_click(self, button: 'TeamButton'):
+        """Makes a team clickable again after a click that can't be applied, and corrects the public pick reply"""
+        team_num, user = button.click_team_future.result()
+        interaction = button.click_interaction
+        button.picked = False
+        button.reset_future()
+        if interaction is not None:  # Wishlist picks have no reply to correct
+            outbound_queue.post(Priority.URGENT, channel_bucket(self.draft_channel), functools.partial(
+                interaction.edit_original_response,
+                content=f"~~{user.nick} picked team {team_num}~~ Ignored, {user.nick} has no picks left"))
+
+    def set_wishlist(self, drafter_name: str, teams: list[int]) -> int:
+        """Replaces a drafter's wishlist and picks from it for any of their picks the draft is already waiting on,
+        returning how many were picked"""
+        self.draft_states.save_wishlist(self.event_id, drafter_name, teams)
+        if teams:
+            self.wishlists[drafter_name] = Wishlist(teams)
+        else:
+            self.wishlists.pop(drafter_name, None)
+        if self.grid is None:  # Still posting the draft messages, the draft loop picks from it when it gets there
+            return 0
+        return self.autodraft_waiting_picks(drafter_name)
+
+    def wishlist_teams(self, drafter_name: str) -> typing.Iterator[int]:
+        """Available teams on the drafter's wishlist, best first, leaving out ones with a click not yet processed"""
+        wishlist = self.wishlists.get(drafter_name)
+        if wishlist is None:
+            return
+        for team in wishlist.available(self.teams_left):
+            if not self.grid.team_buttons[team].click_team_future.done():
+                yield team
+
+    def autodraft_waiting_picks(self, drafter_name: str) -> int:
+        """Picks wishlist teams for the drafter's current and skipped picks, as if they had clicked the buttons"""
+        waiting = [drafter for drafter in self.current_drafters if drafter is not None and drafter.nick == drafter_name]
+        # Clicks the draft loop hasn't processed yet (their team is still available) already cover some of their picks
+        for button in self.grid.team_buttons.values():
+            future = button.click_team_future
+            if (future.done() and not future.cancelled() and self.teams_left.is_available(button.team_num)
+                    and future.result()[1] in waiting):
+                waiting.remove(future.result()[1])
+        num_picked = 0
+        for drafter, team in zip(waiting, self.wishlist_teams(drafter_name)):
+            logger.info("Picking %s for %s from their wishlist", team, drafter_name)
+            self.grid.team_buttons[team].claim(drafter)
+            num_picked += 1
+        return num_picked
+
+
+class ButtonGrid:
+    def __init__(self, teams_list: list[int], teams_left: TeamAvailability, current_drafters: list[discord.Member], team_name_dict,
+                 custom_id_prefix: str):
+
+        # Create the view containing our dropdown
+        self.callback_futures = []
+        self.future_buttons: dict[asyncio.Future, TeamButton] = {}  # The button each team future in callback_futures is for
+        self.team_buttons: dict[int, TeamButton] = {}
+        self.team_view_idxs: dict[int, int] = {}
+        self.views = []
+        self.teams_left = teams_left
+        self.rendered_state = teams_left.state()
+
+        for i, team_index in enumerate(
+                range(0, len(teams_list), 25)):  # 25 is the max number of buttons in a message on Discord
+            row_view = discord.ui.View(timeout=None)
+            for team in teams_list[team_index:team_index + 25]:
+                team_button = TeamButton(team, teams_left, team_name_dict[team], current_drafters,
+                                         custom_id=f"{custom_id_prefix}:team:{team}")
+                row_view.add_item(team_button)
+                self.team_buttons[team] = team_button
+                self.team_view_idxs[team] = i
+                if not team_button.picked:
+                    self.callback_futures.append(team_button.click_team_future)
+                    self.future_buttons[team_button.click_team_future] = team_button
+            self.views.append(row_view)
+
+    def reset_futures(self):
+        """Collects the futures of the teams still available so the same grid can be waited on for the next pick"""
+        self.callback_futures = []
+        self.future_buttons = {}
+        for button in self.team_buttons.values():
+            if button.disabled:
+                continue
+            # A clicked but unprocessed button keeps its completed future so the pick is not lost
+            if button.click_team_future.cancelled():
+                button.reset_future()
+            self.callback_futures.append(button.click_team_future)
+            self.future_buttons[button.click_team_future] = button
+
+    def refresh(self) -> set[int]:
+        """Updates the buttons of teams picked since the last refresh, returning the indexes of the views to edit"""
+        changed_view_idxs = set()
+        for team in self.teams_left.changed_since(self.rendered_state):
+            self.team_buttons[team].set_picked(not self.teams_left.is_available(team))
+            changed_view_idxs.add(self.team_view_idxs[team])
+        self.rendered_state = self.teams_left.state()
+        return changed_view_idxs
+
+
+class SkipButton(discord.ui.Button):
+    def __init__(self, draft: EventDraft):  # TODO Rework dependency on current user
+        # Fixed custom ID so a resumed draft can take over the posted button
+        super(SkipButton, self).__init__(style=discord.ButtonStyle.danger, label="Skip Current Drafter",
+                                         custom_id=f"{draft.event_id}:skip")
+        self.skip_future = asyncio.get_event_loop().create_future()
+        self.draft = draft
+
+    async def callback(self, interaction: discord.Interaction):
+        with metrics.interaction_ack_seconds.labels('skip_button').time():
+            await self.respond(interaction)
+
+    async def respond(self, interaction: discord.Interaction):
+        # TODO Should this also allow current user to skip themselves too?
+        if ADMIN_ROLE_NAME not in [r.name for r in interaction.user.roles]:
+            await interaction.response.send_message("You must be a bot admin in order to skip someone!", ephemeral=True)
+            return
+
+        logger.info("Skipping current drafter")
+        await interaction.response.send_message(f"Skipping {self.draft.current_drafter_user.nick} and allowing next drafter to pick", delete_after=60)
+        self.skip_future.set_result(True)
+
+    def reset_future(self):
+        del self.skip_future
+        self.skip_future = asyncio.get_event_loop().create_future()
+
+
+class TeamButton(discord.ui.Button):
+
+    def __init__(self, team_num, teams_left: TeamAvailability, team_name,
+                 current_users: list[discord.Member], custom_id: str):  # TODO Rework dependency on current user
+        picked = not teams_left.is_available(team_num)
+        label = f"{team_num:>4}"
+        super(TeamButton, self).__init__(style=discord.ButtonStyle.red if picked else discord.ButtonStyle.green,
+                                         label=label, disabled=picked, custom_id=custom_id)
+        self.team_num = team_num
+        self.picked = picked
+        self.teams_left = teams_left
+        self.current_users = current_users
+
+        self.click_team_future = asyncio.get_event_loop().create_future()
+        self.click_interaction: discord.Interaction = None  # The click that completed the future, to correct its reply
+        self.click_order = -1
+
+    async def callback(self, interaction: discord.Interaction):
+        with metrics.interaction_ack_seconds.labels('team_button').time():
+            await self.respond(interaction)
+
+    async def respond(self, interaction: discord.Interaction):
+        if interaction.user not in self.current_users:
+            return await interaction.response.send_message("It is not your turn to pick!", ephemeral=True)
+        if self.click_team_future.done() or not self.teams_left.is_available(self.team_num):
+            return await interaction.response.send_message(f"Team {self.team_num} has already been picked!",
+                                                           ephemeral=True)
+
+        await interaction.response.send_message(f"{interaction.user.nick} picked team {self.team_num}!", delete_after=60)
+
+        logger.debug("Picked %s", self.team_num)
+        self.claim(interaction.user, interaction)
+
+    def claim(self, user: discord.Member, interaction: discord.Interaction = None):
+        """Completes the team's future for the user, as a click or a wishlist pick"""
+        self.picked = True
+        self.click_interaction = interaction
+        self.click_order = next(click_order)
+        self.click_team_future.set_result((self.team_num, user))
+
+    def reset_future(self):
+        del self.click_team_future
+        self.click_team_future = asyncio.get_event_loop().create_future()
+        self.click_interaction = None
+
+    def set_picked(self, picked: bool):
+        self.picked = picked
+        self.style = discord.ButtonStyle.red if picked else discord.ButtonStyle.green
+        self.disabled = picked
+
+
+class CompactPicker(ButtonGrid):
+    """The team picker as a single message of select menus, one per 25 available teams, instead of a grid of button
+    messages
+
+    The grid's TeamButtons are kept, unsent, for their futures and pick checks, so the draft loop, wishlists and /pick
+    work the same with either picker. Picked teams are dropped from the menus instead of turning red, so the message
+    shrinks as the draft goes on.
+    """
+
+    def __init__(self, teams_list: list[int], teams_left: TeamAvailability, current_drafters: list[discord.Member],
+                 team_name_dict, custom_id_prefix: str):
+        super().__init__(teams_list, teams_left, current_drafters, team_name_dict, custom_id_prefix)
+        self.team_view_idxs = {team: 0 for team in teams_list}
+        self.views = [DropdownView(self, team_name_dict, custom_id_prefix)]
+
+    def refresh(self) -> set[int]:
+        """Rebuilds the menus once enough of the listed teams were picked, picking a listed team that was already taken
+        gets the same reply as clicking it in the grid, so stale entries are harmless in between"""
+        super().refresh()
+        if self.views[0].num_stale() < COMPACT_PICKER_MAX_STALE:
+            return set()
+        self.views[0].update()
+        return {0}
+
+
+class DropdownView(discord.ui.View):
+    def __init__(self, picker: ButtonGrid, team_name_dict: dict[int, str], custom_id_prefix: str):
+        super().__init__(timeout=None)
+        self.picker = picker
+        self.team_name_dict = team_name_dict
+        self.custom_id_prefix = custom_id_prefix
+        self.listed_teams: list[int] = []
+        self.update()
+
+    def num_stale(self) -> int:
+        """Listed teams that have been picked since the menus were built"""
+        return sum(1 for team in self.listed_teams if not self.picker.teams_left.is_available(team))
+
+    def update(self):
+        """Rebuilds the menus from the teams still available"""
+        self.clear_items()
+        available_teams = self.picker.teams_left.available_teams()
+        self.listed_teams = available_teams[:MAX_DISCORD_SELECTORS * MAX_VIEW_ROWS]
+        # 25 is the max number of options in a dropdown and 5 the max number of dropdowns in a message on Discord
+        for i, team_index in enumerate(range(0, len(self.listed_teams), MAX_DISCORD_SELECTORS)):
+            self.add_item(Dropdown(self.picker, self.listed_teams[team_index:team_index + MAX_DISCORD_SELECTORS],
+                                   self.team_name_dict, row=i, custom_id=f"{self.custom_id_prefix}:select:{i}"))
+
+
+class Dropdown(discord.ui.Select):
+    def __init__(self, picker: ButtonGrid, team_list: list[int], team_name_dict: dict[int, str], row: int,
+                 custom_id: str):
+        self.picker = picker
+        # Set the options that will be presented inside the dropdown
+        options = [discord.SelectOption(label=f"{team_num} - {team_name_dict[team_num]}"[:MAX_OPTION_LABEL_LENGTH],
+                                        value=str(team_num))
+                   for team_num in team_list]
+
+        super().__init__(placeholder=f'Select your next pick: ({team_list[0]} - {team_list[-1]})', min_values=1,
+                         max_values=1, options=options, row=row, custom_id=custom_id)
+
+    async def callback(self, interaction: discord.Interaction):
+        with metrics.interaction_ack_seconds.labels('team_select').time():
+            # Handled by the team's button, which checks whose turn it is and that the team is still available
+            await self.picker.team_buttons[int(self.values[0])].respond(interaction)
@@ -0,0 +1,196 @@
+import datetime
+import json
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass, field
+
+STATE_VERSION = 1
+
+logger = logging.getLogger('fantasy_first')
+
+
+@dataclass
+class DraftState:
+    """Everything needed to pick a draft back up after a restart without reading the sheet or re-posting messages"""
+    event_id: str
+    channel_id: int
+    all_teams: list[int]
+    team_name_dict: dict[int, str]
+    drafter_names: list[str]
+    draft_picks: dict[str, list[None | int]]
+    draft_start_time: datetime.datetime
+    draft_end_datetime: datetime.datetime
+    # Deadline of each pick that was open when the draft started, keyed by overall pick number
+    pick_deadlines: dict[int, datetime.datetime]
+    pick_num: int = 0
+    last_added_pick_num: int = -1  # Last pick whose drafter was added to current_drafters
+    num_teams_drafted: int = 0
+    current_drafters: list[str] = field(default_factory=list)  # Nicknames, skipped drafters and the current one
+    # Message IDs in the draft channel
+    draft_pick_msg_ids: dict[int, int] = field(default_factory=dict)
+    pick_table_msg_id: int | None = None
+    skip_button_msg_id: int | None = None
+    skipped_picker_msg_id: int | None = None
+    grid_msg_ids: list[int] = field(default_factory=list)
+    tracked_msg_ids: list[int] = field(default_factory=list)  # Messages to delete when the draft ends or stops
+    compact_picker: bool = False  # Single message of select menus instead of the button grid
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'version': STATE_VERSION,
+            'event_id': self.event_id,
+            'channel_id': self.channel_id,
+            'all_teams': self.all_teams,
+            'team_name_dict': [[team, name] for team, name in self.team_name_dict.items()],
+            'drafter_names': self.drafter_names,
+            'draft_picks': self.draft_picks,
+            'draft_start_time': self.draft_start_time.isoformat(),
+            'draft_end_datetime': self.draft_end_datetime.isoformat(),
+            'pick_deadlines': [[pick_num, deadline.isoformat()] for pick_num, deadline in self.pick_deadlines.items()],
+            'pick_num': self.pick_num,
+            'last_added_pick_num': self.last_added_pick_num,
+            'num_teams_drafted': self.num_teams_drafted,
+            'current_drafters': self.current_drafters,
+            'draft_pick_msg_ids': [[pick_num, msg_id] for pick_num, msg_id in self.draft_pick_msg_ids.items()],
+            'pick_table_msg_id': self.pick_table_msg_id,
+            'skip_button_msg_id': self.skip_button_msg_id,
+            'skipped_picker_msg_id': self.skipped_picker_msg_id,
+            'grid_msg_ids': self.grid_msg_ids,
+            'tracked_msg_ids': self.tracked_msg_ids,
+            'compact_picker': self.compact_picker,
+        })
+
+    @classmethod
+    def from_json(cls, state_json: str) -> 'DraftState':
+        state = json.loads(state_json)
+        if state.get('version') != STATE_VERSION:
+            raise ValueError(f"Unsupported draft state version {state.get('version')}")
+        return cls(
+            event_id=state['event_id'],
+            channel_id=state['channel_id'],
+            all_teams=state['all_teams'],
+            team_name_dict={team: name for team, name in state['team_name_dict']},
+            drafter_names=state['drafter_names'],
+            draft_picks=state['draft_picks'],
+            draft_start_time=datetime.datetime.fromisoformat(state['draft_start_time']),
+            draft_end_datetime=datetime.datetime.fromisoformat(state['draft_end_datetime']),
+            pick_deadlines={pick_num: datetime.datetime.fromisoformat(deadline)
+                            for pick_num, deadline in state['pick_deadlines']},
+            pick_num=state['pick_num'],
+            last_added_pick_num=state['last_added_pick_num'],
+            num_teams_drafted=state['num_teams_drafted'],
+            current_drafters=state['current_drafters'],
+            draft_pick_msg_ids={pick_num: msg_id for pick_num, msg_id in state['draft_pick_msg_ids']},
+            pick_table_msg_id=state['pick_table_msg_id'],
+            skip_button_msg_id=state['skip_button_msg_id'],
+            skipped_picker_msg_id=state['skipped_picker_msg_id'],
+            grid_msg_ids=state['grid_msg_ids'],
+            tracked_msg_ids=state['tracked_msg_ids'],
+            compact_picker=state.get('compact_picker', False),  # Saved before the compact picker existed
+        )
+
+
+class DraftStateStore:
+    """SQLite store of in-progress drafts
+
+    Each draft's state is rewritten in one transaction whenever it changes, and every pick and skip is also appended
+    to a history table, so a crash at any point leaves the last consistent state to resume from.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.db = sqlite3.connect(db_path, isolation_level=None)  # Autocommit, transactions are explicit
+        # WAL commits are a single append, NORMAL sync survives the bot crashing (only an OS crash can lose the last one)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS drafts ("
+                        "event_id TEXT PRIMARY KEY, channel_id INTEGER NOT NULL, state TEXT NOT NULL, "
+                        "updated_at REAL NOT NULL)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS draft_history ("
+                        "id INTEGER PRIMARY KEY AUTOINCREMENT, event_id TEXT NOT NULL, action TEXT NOT NULL, "
+                        "drafter TEXT, round_num INTEGER, team_num INTEGER, logged_at REAL NOT NULL)")
+        # Submitted before or during a draft, so they live apart from the draft's state
+        self.db.execute("CREATE TABLE IF NOT EXISTS wishlists ("
+                        "event_id TEXT NOT NULL, drafter TEXT NOT NULL, teams TEXT NOT NULL, updated_at REAL NOT NULL, "
+                        "PRIMARY KEY (event_id, drafter))")
+        # Saved states that couldn't be read back, kept for inspection instead of being overwritten
+        self.db.execute("CREATE TABLE IF NOT EXISTS quarantined_drafts ("
+                        "id INTEGER PRIMARY KEY AUTOINCREMENT, event_id TEXT NOT NULL, channel_id INTEGER NOT NULL, "
+                        "state TEXT NOT NULL, updated_at REAL NOT NULL, error TEXT NOT NULL, quarantined_at REAL NOT NULL)")
+
+    def save(self, state: DraftState, action: str = None, drafter: str = None, round_num: int = None,
+             team_num: int = None):
+        """Replaces the draft's state, also logging the action (ex. 'pick', 'skip') that led to it if given"""
+        self.save_actions(state, [(action, drafter, round_num, team_num)] if action is not None else [])
+
+    def save_actions(self, state: DraftState, actions: list[tuple[str, str, int, int]]):
+        """Replaces the draft's state and logs every (action, drafter, round_num, team_num) that led to it in one
+        transaction, for when several picks are applied together"""
+        now = time.time()
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.execute("INSERT OR REPLACE INTO drafts (event_id, channel_id, state, updated_at) VALUES (?, ?, ?, ?)",
+                            (state.event_id, state.channel_id, state.to_json(), now))
+            self.db.executemany("INSERT INTO draft_history (event_id, action, drafter, round_num, team_num, logged_at) "
+                                "VALUES (?, ?, ?, ?, ?, ?)",
+                                [(state.event_id, *action, now) for action in actions])
+
+    def load(self, event_id: str) -> DraftState | None:
+        """The draft's saved state, None if there is none or it can't be read (it's quarantined so it isn't lost)"""
+        row = self.db.execute("SELECT state FROM drafts WHERE event_id = ?", (event_id,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return DraftState.from_json(row[0])
+        except (ValueError, KeyError, TypeError) as err:
+            logger.error("Unreadable saved state for %s (%r), moved it to quarantined_drafts and starting over",
+                         event_id, err)
+            self.quarantine(event_id, repr(err))
+            return None
+
+    def quarantine(self, event_id: str, error: str):
+        """Moves the draft's saved state out of the way, so the next save can't overwrite it"""
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.execute("INSERT INTO quarantined_drafts (event_id, channel_id, state, updated_at, error, quarantined_at) "
+                            "SELECT event_id, channel_id, state, updated_at, ?, ? FROM drafts WHERE event_id = ?",
+                            (error, time.time(), event_id))
+            self.db.execute("DELETE FROM drafts WHERE event_id = ?", (event_id,))
+
+    def quarantined(self, event_id: str) -> list[tuple[str, str]]:
+        """(state, error) of every saved state of the draft that couldn't be read, oldest first"""
+        return self.db.execute("SELECT state, error FROM quarantined_drafts WHERE event_id = ? ORDER BY id",
+                               (event_id,)).fetchall()
+
+    def delete(self, event_id: str):
+        """Forgets a finished or stopped draft, its history is kept"""
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.execute("DELETE FROM drafts WHERE event_id = ?", (event_id,))
+
+    def save_wishlist(self, event_id: str, drafter: str, teams: list[int]):
+        """Replaces a drafter's ranked wishlist, an empty one removes it"""
+        with self.db:
+            self.db.execute("BEGIN")
+            if teams:
+                self.db.execute("INSERT OR REPLACE INTO wishlists (event_id, drafter, teams, updated_at) "
+                                "VALUES (?, ?, ?, ?)", (event_id, drafter, json.dumps(teams), time.time()))
+            else:
+                self.db.execute("DELETE FROM wishlists WHERE event_id = ? AND drafter = ?", (event_id, drafter))
+
+    def load_wishlists(self, event_id: str) -> dict[str, list[int]]:
+        """Ranked team lists keyed by drafter nickname"""
+        rows = self.db.execute("SELECT drafter, teams FROM wishlists WHERE event_id = ?", (event_id,)).fetchall()
+        return {drafter: json.loads(teams) for drafter, teams in rows}
+
+    def history(self, event_id: str) -> list[tuple]:
+        """(action, drafter, round_num, team_num, logged_at) of every logged action, oldest first"""
+        return self.db.execute("SELECT action, drafter, round_num, team_num, logged_at FROM draft_history "
+                               "WHERE event_id = ? ORDER BY id", (event_id,)).fetchall()
+
+    def saved_event_ids(self) -> list[str]:
+        return [row[0] for row in self.db.execute("SELECT event_id FROM drafts ORDER BY event_id")]
+
+    def close(self):
+        self.db.close()
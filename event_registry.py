@@ -0,0 +1,158 @@
+import asyncio
+import bisect
+import logging
+import time
+from dataclasses import dataclass, field
+
+import pygsheets
+
+from draft import EVENT_ID_CELL
+from sheet_access import AsyncSheets, a1_range
+
+EVENT_REFRESH_INTERVAL = 15 * 60  # Seconds between background rescans of the spreadsheet
+MAX_AUTOCOMPLETE_CHOICES = 25  # Discord's limit
+WORKBOOK_SEPARATOR = '-'  # Between a workbook's label and the event ID, also used in file names so no ':'
+
+logger = logging.getLogger('fantasy_first')
+
+
+def discover_event_pages(spreadsheet: pygsheets.Spreadsheet, excluded_titles: set[str]) -> dict[str, pygsheets.Worksheet]:
+    """Maps event IDs to their pages, reading every page's event ID cell in a single batched request"""
+    event_pages = [page for page in spreadsheet.worksheets() if page.title not in excluded_titles]
+    if not event_pages:
+        return {}
+
+    value_ranges = spreadsheet.client.sheet.values_batch_get(
+        spreadsheet.id, [a1_range(page.title, EVENT_ID_CELL) for page in event_pages])
+
+    # Ranges are returned in request order, empty cells have no 'values' entry
+    discovered_events = {}
+    for event_page, value_range in zip(event_pages, value_ranges):
+        values = value_range.get('values', [['']])
+        event_id = str(values[0][0]).strip() if values and values[0] else ''
+        if event_id == '':
+            logger.debug("Page %s has no event ID, skipping", event_page.title)
+            continue
+        discovered_events[event_id] = event_page
+    return discovered_events
+
+
+@dataclass
+class Workbook:
+    """One spreadsheet of event pages (a season or a league) and what was last scanned from it"""
+    label: str
+    title: str
+    spreadsheet_id: str = None  # Cached after the first open, reopening by key skips the Drive search by title
+    event_pages: dict[str, pygsheets.Worksheet] = field(default_factory=dict)  # Keyed by the page's event ID
+    loaded: bool = False
+    refresh_task: asyncio.Task = None
+
+
+class EventRegistry:
+    """Event IDs and their pages across every workbook, scanned on first use and rescanned on demand or in the background
+
+    Lookups and searches are served from memory, so new event pages show up in command autocomplete after the next
+    refresh without restarting the bot or syncing the command tree. Each workbook is scanned and cached on its own, so
+    workbooks are scanned in parallel and rescanning one leaves the others alone. Events of the first workbook keep
+    their plain event ID, the others are prefixed with their workbook's label (ex. league2-2024mabr) so the same event
+    can be drafted in several leagues.
+    """
+
+    def __init__(self, sheets: AsyncSheets, workbooks: dict[str, str], excluded_titles: set[str]):
+        self.sheets = sheets
+        self.workbooks = {label: Workbook(label, title) for label, title in workbooks.items()}
+        self.default_label = next(iter(workbooks))
+        self.excluded_titles = excluded_titles
+        self.event_pages: dict[str, pygsheets.Worksheet] = {}  # Keyed by event key, every workbook
+        self._sorted_ids: list[tuple[str, str]] = []  # (lowercase key, key) for prefix search
+        self._background_task: asyncio.Task = None
+
+    @property
+    def loaded(self) -> bool:
+        return all(workbook.loaded for workbook in self.workbooks.values())
+
+    def event_key(self, label: str, event_id: str) -> str:
+        return event_id if label == self.default_label else f"{label}{WORKBOOK_SEPARATOR}{event_id}"
+
+    def workbook_pages(self, label: str) -> dict[str, pygsheets.Worksheet]:
+        """One workbook's pages keyed by their plain event ID"""
+        return self.workbooks[label].event_pages
+
+    def _discover(self, client: pygsheets.client.Client, workbook: Workbook) -> dict[str, pygsheets.Worksheet]:
+        # Reopened on every refresh so pages added since the last one are listed
+        if workbook.spreadsheet_id is None:
+            spreadsheet = client.open(workbook.title)
+            workbook.spreadsheet_id = spreadsheet.id
+        else:
+            spreadsheet = client.open_by_key(workbook.spreadsheet_id)
+        return discover_event_pages(spreadsheet, self.excluded_titles)
+
+    async def refresh(self, label: str = None) -> dict[str, pygsheets.Worksheet]:
+        """Rescans one workbook or all of them at once, callers that arrive while a scan is running share it"""
+        labels = [label] if label is not None else list(self.workbooks)
+        await asyncio.gather(*[self._refresh_workbook(self.workbooks[label]) for label in labels])
+        return self.event_pages
+
+    async def _refresh_workbook(self, workbook: Workbook):
+        if workbook.refresh_task is None or workbook.refresh_task.done():
+            workbook.refresh_task = asyncio.create_task(self._scan(workbook))
+        await asyncio.shield(workbook.refresh_task)
+
+    async def _scan(self, workbook: Workbook):
+        refresh_start = time.perf_counter()
+        event_pages = await self.sheets.run(self._discover, workbook, operation='discover_events')
+        added = event_pages.keys() - workbook.event_pages.keys() if workbook.loaded else set()
+        workbook.event_pages = event_pages
+        workbook.loaded = True
+        self.event_pages = {self.event_key(label, event_id): event_page
+                            for label, scanned in self.workbooks.items()
+                            for event_id, event_page in scanned.event_pages.items()}
+        self._sorted_ids = sorted((event_key.lower(), event_key) for event_key in self.event_pages)
+        if added:
+            logger.info("Found %s events in %s in %.3fs, new: %s", len(event_pages), workbook.title,
+                        time.perf_counter() - refresh_start, ', '.join(sorted(added)))
+        else:
+            logger.info("Found %s events in %s in %.3fs", len(event_pages), workbook.title,
+                        time.perf_counter() - refresh_start)
+
+    async def ensure_loaded(self):
+        unloaded = [label for label, workbook in self.workbooks.items() if not workbook.loaded]
+        if unloaded:
+            await asyncio.gather(*[self.refresh(label) for label in unloaded])
+
+    async def get(self, event_id: str) -> pygsheets.Worksheet | None:
+        await self.ensure_loaded()
+        return self.event_pages.get(event_id)
+
+    def search(self, text: str, limit: int = MAX_AUTOCOMPLETE_CHOICES) -> list[str]:
+        """Event IDs starting with the text, followed by ones containing it (ex. mabr finds 2024mabr), case insensitive"""
+        text = text.strip().lower()
+        matches = []
+        idx = bisect.bisect_left(self._sorted_ids, (text, ''))
+        while idx < len(self._sorted_ids) and len(matches) < limit and self._sorted_ids[idx][0].startswith(text):
+            matches.append(self._sorted_ids[idx][1])
+            idx += 1
+        if len(matches) < limit and text:
+            prefix_matches = set(matches)
+            for lower_id, event_id in self._sorted_ids:
+                if text in lower_id and event_id not in prefix_matches:
+                    matches.append(event_id)
+                    if len(matches) >= limit:
+                        break
+        return matches
+
+    def start_background_refresh(self, interval: float = EVENT_REFRESH_INTERVAL):
+        if self._background_task is None or self._background_task.done():
+            self._background_task = asyncio.create_task(self._refresh_periodically(interval))
+
+    async def _refresh_periodically(self, interval: float):
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Could not refresh the event list, keeping the previous one")
+            await asyncio.sleep(interval)
+
+    def stop(self):
+        if self._background_task is not None:
+            self._background_task.cancel()
@@ -0,0 +1,433 @@
+import asyncio
+import collections
+import datetime
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import typing
+
+import discord
+from pygsheets.utils import format_addr
+
+from draft import (ACTIVE_HOURS_START_TIME_CELL, DRAFT_END_TIME_CELL, DRAFT_FIRST_ROW, DRAFTER_COL,
+                   EVENT_ID_CELL, SHEETS_SERIAL_NUMBER_DATETIME_START, TEAM_NAME_COL, TEAMS_COL, TEAMS_FIRST_ROW)
+from draft_state import DraftStateStore
+from member_index import MemberIndex
+
+# In-process stand-ins for Discord and Google Sheets, so drafts can be benchmarked without a network or credentials.
+# They only implement what drafts use, record every API call and can add latency to each one.
+
+A1_RANGE_PATTERN = re.compile(r"^'((?:[^']|'')*)'!([A-Z]+[0-9]+)(?::([A-Z]+[0-9]+))?$")
+
+_snowflakes = itertools.count(int(time.time() * 1000 - 1420070400000) << 22)  # Discord epoch snowflakes
+
+
+def next_snowflake() -> int:
+    return next(_snowflakes)
+
+
+class ApiStats:
+    """Counts API calls by kind, safe to use from the sheets worker threads"""
+
+    def __init__(self):
+        self.calls: collections.Counter = collections.Counter()
+        self.view_payload_bytes = 0  # Size of the components JSON sent with messages and edits
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, count: int = 1):
+        with self._lock:
+            self.calls[kind] += count
+
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+    def record_view(self, view: discord.ui.View | None):
+        """Counts the size of the components JSON a send or edit would upload, to compare pickers by payload"""
+        if view is not None:
+            payload_bytes = len(json.dumps(view.to_components()))
+            with self._lock:
+                self.view_payload_bytes += payload_bytes
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+            self.view_payload_bytes = 0
+
+
+class Latency:
+    """Injected latency per call, uniform in mean +/- jitter seconds"""
+
+    def __init__(self, mean: float = 0.0, jitter: float = 0.0, rng: random.Random = None):
+        self.mean = mean
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+
+    def sample(self) -> float:
+        return max(0.0, self.mean + self.rng.uniform(-self.jitter, self.jitter))
+
+    async def wait(self):
+        delay = self.sample()
+        await asyncio.sleep(delay)  # Always yields, like a real request would
+
+    def block(self):
+        """For calls made on a worker thread"""
+        delay = self.sample()
+        if delay > 0:
+            time.sleep(delay)
+
+
+# Google Sheets
+
+
+class FakeSpreadsheet:
+    def __init__(self, title: str = 'Fake FF'):
+        self.id = f"fake-{next_snowflake()}"
+        self.title = title
+        self.cells: dict[str, dict[tuple[int, int], typing.Any]] = {}  # Page title -> (row, col) -> value
+        self.lock = threading.Lock()
+
+    def add_worksheet(self, title: str) -> 'FakeWorksheet':
+        self.cells.setdefault(title, {})
+        return FakeWorksheet(self, title)
+
+    def worksheets(self) -> list['FakeWorksheet']:
+        return [FakeWorksheet(self, title) for title in self.cells]
+
+
+class FakeWorksheet:
+    """Stand-in for pygsheets.Worksheet, only what AsyncWorksheet reads"""
+
+    def __init__(self, spreadsheet: FakeSpreadsheet, title: str):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.url = f"https://docs.google.com/spreadsheets/d/{spreadsheet.id}#{title}"
+
+    def set_value(self, addr: str | tuple[int, int], value):
+        if isinstance(addr, str):
+            addr = format_addr(addr, output='tuple')
+        with self.spreadsheet.lock:
+            self.spreadsheet.cells[self.title][tuple(addr)] = value
+
+    def get_value(self, addr: str | tuple[int, int]):
+        if isinstance(addr, str):
+            addr = format_addr(addr, output='tuple')
+        return self.spreadsheet.cells[self.title].get(tuple(addr), '')
+
+
+def datetime_to_sheets_serial(value: datetime.datetime) -> float:
+    return (value - SHEETS_SERIAL_NUMBER_DATETIME_START) / datetime.timedelta(days=1)
+
+
+def make_event_worksheet(spreadsheet: FakeSpreadsheet, title: str, event_id: str, teams: dict[int, str],
+                         drafter_names: list[str], draft_end: datetime.datetime,
+                         active_hours: tuple[datetime.time, datetime.time] = None) -> FakeWorksheet:
+    """Fills in an event page laid out like the event template"""
+    worksheet = spreadsheet.add_worksheet(title)
+    worksheet.set_value(EVENT_ID_CELL, event_id)
+    worksheet.set_value(DRAFT_END_TIME_CELL, datetime_to_sheets_serial(draft_end))
+    for team_idx, (team_num, team_name) in enumerate(teams.items()):
+        worksheet.set_value((TEAMS_FIRST_ROW + team_idx, TEAMS_COL), team_num)
+        worksheet.set_value((TEAMS_FIRST_ROW + team_idx, TEAM_NAME_COL), team_name)
+    for drafter_idx, drafter_name in enumerate(drafter_names):
+        worksheet.set_value((DRAFT_FIRST_ROW + drafter_idx, DRAFTER_COL), drafter_name)
+    if active_hours is not None:
+        start_row, start_col = format_addr(ACTIVE_HOURS_START_TIME_CELL, output='tuple')
+        for col_offset, active_time in enumerate(active_hours):
+            serial = (active_time.hour * 3600 + active_time.minute * 60 + active_time.second) / 86400
+            worksheet.set_value((start_row, start_col + col_offset), serial)
+    return worksheet
+
+
+class FakeSheetsApi:
+    """Stand-in for pygsheets' SheetAPIWrapper (client.sheet), only the batch calls drafts make"""
+
+    def __init__(self, spreadsheet: FakeSpreadsheet, stats: ApiStats, latency: Latency):
+        self.spreadsheet = spreadsheet
+        self.stats = stats
+        self.latency = latency
+
+    def _parse_range(self, a1_range: str) -> tuple[str, tuple[int, int], tuple[int, int]]:
+        match = A1_RANGE_PATTERN.match(a1_range)
+        if match is None:
+            raise ValueError(f"Unsupported range {a1_range}")
+        title = match.group(1).replace("''", "'")
+        start = format_addr(match.group(2), output='tuple')
+        end = format_addr(match.group(3), output='tuple') if match.group(3) else start
+        return title, start, end
+
+    def values_batch_get(self, spreadsheet_id: str, value_ranges: list[str], major_dimension='ROWS',
+                         value_render_option=None, date_time_render_option=None) -> list[dict]:
+        self.stats.record('sheets_batch_get')
+        self.latency.block()
+        results = []
+        with self.spreadsheet.lock:
+            for a1_range in value_ranges:
+                title, (start_row, start_col), (end_row, end_col) = self._parse_range(a1_range)
+                cells = self.spreadsheet.cells.get(title, {})
+                rows = []
+                for row in range(start_row, end_row + 1):
+                    values = [cells.get((row, col), '') for col in range(start_col, end_col + 1)]
+                    while values and values[-1] == '':
+                        values.pop()  # The API leaves out trailing empty cells and rows
+                    rows.append(values)
+                while rows and not rows[-1]:
+                    rows.pop()
+                result = {'range': a1_range, 'majorDimension': 'ROWS'}
+                if rows:
+                    result['values'] = rows
+                results.append(result)
+        return results
+
+    def values_batch_update_by_data_filter(self, spreadsheet_id: str, data: list[dict], parse=True):
+        self.stats.record('sheets_batch_update')
+        self.latency.block()
+        with self.spreadsheet.lock:
+            for update in data:
+                title, (start_row, start_col), _ = self._parse_range(update['dataFilter']['a1Range'])
+                for row_offset, row in enumerate(update['values']):
+                    for col_offset, value in enumerate(row):
+                        self.spreadsheet.cells[title][(start_row + row_offset, start_col + col_offset)] = value
+
+
+class FakeSheetsClient:
+    """Stand-in for pygsheets.client.Client, pass lambda: FakeSheetsClient(...) to AsyncSheets"""
+
+    def __init__(self, spreadsheet: FakeSpreadsheet, stats: ApiStats, latency: Latency = None):
+        self.sheet = FakeSheetsApi(spreadsheet, stats, latency or Latency())
+
+
+# Discord
+
+
+class FakeRole:
+    def __init__(self, name: str):
+        self.id = next_snowflake()
+        self.name = name
+
+
+class FakeGuild:
+    def __init__(self, name: str = 'Fake Guild'):
+        self.id = next_snowflake()
+        self.name = name
+        self.members: list[FakeMember] = []
+        self.roles: list[FakeRole] = []
+
+    def get_role(self, name: str) -> FakeRole:
+        for role in self.roles:
+            if role.name == name:
+                return role
+        role = FakeRole(name)
+        self.roles.append(role)
+        return role
+
+    def add_member(self, nick: str, role_names: typing.Iterable[str] = ()) -> 'FakeMember':
+        member = FakeMember(self, nick, [self.get_role(name) for name in role_names])
+        self.members.append(member)
+        return member
+
+
+class FakeMessage:
+    def __init__(self, channel: 'FakeTextChannel | FakeDMChannel', content: str = '', view: discord.ui.View = None,
+                 msg_id: int = None):
+        self.id = msg_id or next_snowflake()
+        self.channel = channel
+        self.content = content
+        self.view = view
+        self.created_at = discord.utils.utcnow()
+        self.deleted = False
+
+    async def edit(self, content: str = None, view: discord.ui.View = None, **kwargs) -> 'FakeMessage':
+        self.channel.stats.record('message_edit')
+        self.channel.stats.record_view(view)
+        await self.channel.latency.wait()
+        if self.deleted:
+            raise discord.NotFound(FakeResponse(404), 'Unknown Message')
+        if content is not None:
+            self.content = content
+        if view is not None:
+            self.view = view
+        if self.channel.edit_listener is not None:
+            self.channel.edit_listener(self)
+        return self
+
+    async def delete(self, delay: float = None):
+        self.channel.stats.record('message_delete')
+        await self.channel.latency.wait()
+        if self.deleted:
+            raise discord.NotFound(FakeResponse(404), 'Unknown Message')
+        self.channel.forget(self)
+
+
+class FakeResponse:
+    """Enough of an aiohttp response for discord.HTTPException"""
+
+    def __init__(self, status: int):
+        self.status = status
+        self.reason = 'Fake'
+
+
+class FakeDMChannel:
+    def __init__(self, user: 'FakeMember', stats: ApiStats, latency: Latency):
+        self.id = next_snowflake()
+        self.recipient = user
+        self.stats = stats
+        self.latency = latency
+        self.messages: dict[int, FakeMessage] = {}
+        self.edit_listener: typing.Callable[[FakeMessage], None] = None  # Called after each successful edit
+
+    async def send(self, content: str = '', **kwargs) -> FakeMessage:
+        self.stats.record('dm_send')
+        await self.latency.wait()
+        msg = FakeMessage(self, content)
+        self.messages[msg.id] = msg
+        return msg
+
+    def forget(self, msg: FakeMessage):
+        msg.deleted = True
+        self.messages.pop(msg.id, None)
+
+
+class FakeMember:
+    def __init__(self, guild: FakeGuild, nick: str, roles: list[FakeRole]):
+        self.id = next_snowflake()
+        self.guild = guild
+        self.name = nick.lower().replace(' ', '_')
+        self.nick = nick
+        self.roles = roles
+        self.mention = f"<@{self.id}>"
+        self.dm_channel: FakeDMChannel = None
+
+    def attach(self, stats: ApiStats, latency: Latency):
+        """Where the member's DMs are counted"""
+        self.dm_channel = FakeDMChannel(self, stats, latency)
+
+    async def send(self, content: str = '', **kwargs) -> FakeMessage:
+        return await self.dm_channel.send(content, **kwargs)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FakeMember) and other.id == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f"<FakeMember nick={self.nick!r}>"
+
+
+class FakePermissions:
+    def __init__(self, can_see: bool = True):
+        self.read_messages = can_see
+        self.send_messages = can_see
+
+
+class FakeTextChannel(discord.TextChannel):
+    """Passes isinstance checks for TextChannel, so bulk deletes take the same path they do against Discord"""
+
+    def __init__(self, guild: FakeGuild, name: str, stats: ApiStats, latency: Latency):
+        self.id = next_snowflake()
+        self.guild = guild
+        self.name = name
+        self.stats = stats
+        self.latency = latency
+        self.messages: dict[int, FakeMessage] = {}
+        self.edit_listener: typing.Callable[[FakeMessage], None] = None  # Called after each successful edit
+        self.hidden_from: set[FakeMember] = set()  # Members who can't see the channel
+
+    def __repr__(self) -> str:
+        return f"<FakeTextChannel name={self.name!r}>"
+
+    async def send(self, content: str = '', view: discord.ui.View = None, delete_after: float = None,
+                   **kwargs) -> FakeMessage:
+        self.stats.record('message_send')
+        self.stats.record_view(view)
+        await self.latency.wait()
+        msg = FakeMessage(self, content, view)
+        self.messages[msg.id] = msg
+        return msg
+
+    def get_partial_message(self, message_id: int) -> FakeMessage:
+        msg = self.messages.get(message_id)
+        if msg is None:  # Deleted, requests on it will fail like they would on Discord
+            msg = FakeMessage(self, msg_id=message_id)
+            msg.deleted = True
+        return msg
+
+    async def delete_messages(self, messages: typing.Iterable[FakeMessage], *, reason: str = None):
+        self.stats.record('bulk_delete')
+        await self.latency.wait()
+        for msg in messages:
+            self.forget(msg)
+
+    def permissions_for(self, member: FakeMember) -> FakePermissions:
+        return FakePermissions(member not in self.hidden_from)
+
+    def forget(self, msg: FakeMessage):
+        msg.deleted = True
+        self.messages.pop(msg.id, None)
+
+
+class FakeInteractionResponse:
+    def __init__(self, interaction: 'FakeInteraction'):
+        self.interaction = interaction
+        self.responded = False
+        self.content: str = None
+
+    async def send_message(self, content: str = '', ephemeral: bool = False, delete_after: float = None, **kwargs):
+        self.interaction.channel.stats.record('interaction_response')
+        await self.interaction.channel.latency.wait()
+        self.responded = True
+        self.content = content
+
+    async def defer(self, **kwargs):
+        self.interaction.channel.stats.record('interaction_response')
+        await self.interaction.channel.latency.wait()
+        self.responded = True
+
+    def is_done(self) -> bool:
+        return self.responded
+
+
+class FakeFollowup:
+    def __init__(self, interaction: 'FakeInteraction'):
+        self.interaction = interaction
+        self.sent: list[str] = []
+
+    async def send(self, content: str = '', ephemeral: bool = False, **kwargs):
+        self.interaction.channel.stats.record('followup_send')
+        await self.interaction.channel.latency.wait()
+        self.sent.append(content)
+
+
+class FakeInteraction:
+    def __init__(self, channel: FakeTextChannel, client: 'FakeBot', user: FakeMember):
+        self.channel = channel
+        self.client = client
+        self.user = user
+        self.guild = channel.guild
+        self.created_at = discord.utils.utcnow()
+        self.response = FakeInteractionResponse(self)
+        self.followup = FakeFollowup(self)
+
+    def is_expired(self) -> bool:
+        return False
+
+    async def edit_original_response(self, content: str = None, **kwargs):
+        self.channel.stats.record('interaction_edit')
+        await self.channel.latency.wait()
+        if content is not None:
+            self.response.content = content
+
+
+class FakeBot:
+    """The parts of FirstBot drafts reach through interaction.client"""
+
+    def __init__(self, draft_state_path: str = ':memory:'):
+        self.member_index = MemberIndex()
+        self.draft_states = DraftStateStore(draft_state_path)
+        self.persistent_views: dict[int, discord.ui.View] = {}
+
+    def add_view(self, view: discord.ui.View, *, message_id: int = None):
+        self.persistent_views[message_id] = view
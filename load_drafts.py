@@ -0,0 +1,291 @@
+import argparse
+import asyncio
+import logging
+import os
+import random
+import re
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+
+from bench_draft import (BenchDraft, DraftResult, DraftScript, LoopLagMonitor, SimulatedEvent, create_event,
+                         percentile, take_turn, wait_for_turn)
+from fakes import ApiStats, FakeBot, FakeGuild, FakeMessage, FakeSheetsClient, FakeSpreadsheet, Latency
+from outbound_queue import CHANNEL_BUCKET_CAPACITY, CHANNEL_BUCKET_PERIOD, GLOBAL_REQUESTS_PER_SECOND, outbound_queue
+from pick_journal import JOURNAL_FLUSH_DELAY
+from sheet_access import AsyncSheets
+from supervisor import DraftHealth, DraftSupervisor
+
+# Load test for many concurrent drafts in one process, ex.
+#   python load_drafts.py --drafts 25,50,100,200 --think-time 4 --discord-latency 0.1
+# Each level ramps up that many drafts under a DraftSupervisor like the bot's, lets scripted drafters act at random
+# intervals for a fixed window and reports picks per second, click to confirmation latency, memory per draft and
+# event loop lag. The highest level that stays within the latency targets is the throughput limit.
+
+CONFIRMATION_PATTERN = re.compile(r" picked team (\d+) for ")
+DRAIN_TIMEOUT = 60.0  # Seconds to wait for confirmations still queued when the window ends
+DRAIN_POLL_INTERVAL = 0.05
+
+logger = logging.getLogger('fantasy_first')
+
+
+class Window:
+    """The measured part of a level, opens once every draft is up and the ramp up has passed
+
+    Drafters wait for it to open, otherwise the drafts started first use up the global rate limit with picks and
+    starve the setup messages of the drafts still starting.
+    """
+
+    def __init__(self):
+        self.start: float = None
+        self.end: float = None
+        self.opened = asyncio.Event()
+
+    def open(self, duration: float):
+        self.start = time.perf_counter()
+        self.end = self.start + duration
+        self.opened.set()
+
+    def contains(self, timestamp: float) -> bool:
+        return self.start is not None and self.start <= timestamp < self.end
+
+    def is_over(self, timestamp: float) -> bool:
+        return self.end is not None and timestamp >= self.end
+
+
+class ConfirmationTracker:
+    """Times each pick from its button callback to the edit of its pick message that confirms it in the channel"""
+
+    def __init__(self):
+        self.pending: dict[int, float] = {}  # Team number to click time
+        self.latencies: list[float] = []
+
+    def clicked(self, team_num: int, click_time: float):
+        self.pending[team_num] = click_time
+
+    def on_edit(self, msg: FakeMessage):
+        match = CONFIRMATION_PATTERN.search(msg.content)
+        if match is None:
+            return
+        click_time = self.pending.pop(int(match.group(1)), None)
+        if click_time is not None:
+            self.latencies.append(time.perf_counter() - click_time)
+
+
+@dataclass
+class LevelResult:
+    drafts: int
+    window: float = 0.0
+    picks: int = 0
+    api_calls: int = 0
+    unconfirmed: int = 0
+    failed: int = 0
+    memory_per_draft: float = 0.0  # Bytes
+    confirmation_latencies: list[float] = field(default_factory=list)
+    turn_latencies: list[float] = field(default_factory=list)
+    lags: list[float] = field(default_factory=list)
+
+    @property
+    def picks_per_second(self) -> float:
+        return self.picks / self.window if self.window else 0.0
+
+    def missed_targets(self, confirmation_target: float, lag_target: float) -> list[str]:
+        missed = []
+        if self.failed:
+            missed.append(f"{self.failed} drafts failed")
+        if self.unconfirmed:
+            missed.append(f"{self.unconfirmed} picks never confirmed")
+        if percentile(self.confirmation_latencies, 99) > confirmation_target:
+            missed.append(f"confirmation p99 over {confirmation_target * 1000:.0f}ms")
+        if percentile(self.lags, 99) > lag_target:
+            missed.append(f"loop lag p99 over {lag_target * 1000:.0f}ms")
+        return missed
+
+
+async def drive_load(event: SimulatedEvent, draft_task: asyncio.Task, script: DraftScript, rng: random.Random,
+                     window: Window, tracker: ConfirmationTracker, result: DraftResult):
+    """Plays the event's drafters until the window ends, only actions taken inside the window are counted"""
+    draft = event.draft
+    action_time = None
+    await window.opened.wait()
+    while await wait_for_turn(draft, draft_task):
+        now = time.perf_counter()
+        if action_time is not None and window.contains(action_time):
+            result.pick_latencies.append(now - action_time)
+        if script.think_time:
+            await asyncio.sleep(rng.uniform(0, script.think_time))
+        action_time = time.perf_counter()
+        if window.is_over(action_time) or draft.is_stopped():
+            return
+        counted = window.contains(action_time)
+        team_num = await take_turn(event, script, rng, result if counted else DraftResult())
+        if team_num is not None and counted:
+            tracker.clicked(team_num, action_time)
+
+
+async def run_level(num_drafts: int, args: argparse.Namespace, rng: random.Random) -> LevelResult:
+    level = LevelResult(num_drafts)
+    stats = ApiStats()
+    discord_latency = Latency(args.discord_latency, args.discord_latency / 2, random.Random(rng.random()))
+    sheets_latency = Latency(args.sheets_latency, args.sheets_latency / 2, random.Random(rng.random()))
+    if args.rate_limits:
+        outbound_queue.set_rate_limits(CHANNEL_BUCKET_CAPACITY, CHANNEL_BUCKET_PERIOD, GLOBAL_REQUESTS_PER_SECOND)
+    else:
+        outbound_queue.set_rate_limits(10 ** 6, 1.0, 10 ** 6)
+
+    spreadsheet = FakeSpreadsheet()
+    sheets = AsyncSheets(lambda: FakeSheetsClient(spreadsheet, stats, sheets_latency))
+    bot = FakeBot(os.path.join(args.work_dir, f'draft_state_{num_drafts}.db'))
+    guild = FakeGuild()
+    script = DraftScript(skip_rate=args.skip_rate, timeout_rate=args.timeout_rate, late_pick_rate=args.late_pick_rate,
+                         think_time=args.think_time)
+    supervisor = DraftSupervisor(max_concurrent=num_drafts, max_restarts=0)
+    tracker = ConfirmationTracker()
+    window = Window()
+
+    # Only traced while the drafts are being set up, tracemalloc slows everything down too much to measure under
+    tracemalloc.start()
+    traced_before = tracemalloc.get_traced_memory()[0]
+    events = await asyncio.gather(*[create_event(event_num, args.drafters, args.teams, args.rounds, guild, bot,
+                                                 spreadsheet, sheets, stats, discord_latency, args.journal_flush_delay)
+                                    for event_num in range(num_drafts)])
+    for event in events:
+        event.channel.edit_listener = tracker.on_edit
+
+    async def no_restart() -> BenchDraft:
+        raise RuntimeError("Load test drafts are not restarted")
+
+    results = [DraftResult() for _ in events]
+    started = 0
+    all_started = asyncio.Event()
+
+    async def run_event(event_num: int, event: SimulatedEvent):
+        nonlocal started
+        await asyncio.sleep(args.ramp_up * event_num / num_drafts)
+        supervised = supervisor.start(event.event_id, event.draft, no_restart)
+        try:
+            ready = await wait_for_turn(event.draft, supervised.task)
+        finally:
+            started += 1
+            if started == num_drafts:
+                all_started.set()
+        if ready:
+            event.draft.turn_ready.set()  # Hand the first turn to the driver
+            await drive_load(event, supervised.task, script, rng, window, tracker, results[event_num])
+
+    level_start = time.perf_counter()
+    event_tasks = [asyncio.create_task(run_event(event_num, event)) for event_num, event in enumerate(events)]
+    await all_started.wait()
+    level.memory_per_draft = (tracemalloc.get_traced_memory()[0] - traced_before) / num_drafts
+    tracemalloc.stop()
+    await asyncio.sleep(max(0.0, level_start + args.ramp_up - time.perf_counter()))
+
+    lag_monitor = LoopLagMonitor()
+    lag_monitor.start()
+    stats.reset()
+    window.open(args.duration)
+    await asyncio.sleep(args.duration)
+    level.api_calls = stats.total()
+    await lag_monitor.stop()
+
+    # Confirmations for picks made inside the window still count if they land after it, with the same pacing
+    drain_start = time.perf_counter()
+    while tracker.pending and time.perf_counter() - drain_start < DRAIN_TIMEOUT:
+        await asyncio.sleep(DRAIN_POLL_INTERVAL)
+    level.unconfirmed = len(tracker.pending)
+
+    # Nothing left to measure, so cleanup runs unpaced for the next level to start from an empty queue
+    outbound_queue.set_rate_limits(10 ** 6, 1.0, 10 ** 6)
+    for event in events:
+        event.draft.stop_draft()
+    await asyncio.gather(*event_tasks)
+    await supervisor.shutdown()
+    while len(outbound_queue):
+        await asyncio.sleep(DRAIN_POLL_INTERVAL)
+    sheets.shutdown()
+    bot.draft_states.close()
+
+    level.window = args.duration
+    level.picks = sum(result.picks for result in results)
+    level.failed = sum(1 for supervised in supervisor.health().values() if supervised.health == DraftHealth.FAILED)
+    level.confirmation_latencies = tracker.latencies
+    level.turn_latencies = [latency for result in results for latency in result.pick_latencies]
+    level.lags = lag_monitor.lags
+    return level
+
+
+def format_ms(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}ms"
+
+
+async def run_load_test(args: argparse.Namespace):
+    rng = random.Random(args.seed)
+    levels = [int(num_drafts) for num_drafts in args.drafts.split(',')]
+    print(f"{args.drafters} drafters x {args.rounds} rounds per draft, think time up to {args.think_time:.1f}s, "
+          f"discord latency {format_ms(args.discord_latency)}, sheets latency {format_ms(args.sheets_latency)}, "
+          f"rate limits {'on' if args.rate_limits else 'off'}, {args.duration:.0f}s window per level")
+    print(f"{'drafts':>6} {'picks/s':>8} {'api/s':>7} {'confirm p50':>11} {'confirm p99':>11} {'unconfirmed':>11} "
+          f"{'turn p99':>9} {'lag p99':>8} {'lag max':>8} {'KiB/draft':>9}")
+
+    results = []
+    for num_drafts in levels:
+        level = await run_level(num_drafts, args, rng)
+        results.append(level)
+        print(f"{level.drafts:>6} {level.picks_per_second:>8.2f} {level.api_calls / level.window:>7.1f} "
+              f"{format_ms(percentile(level.confirmation_latencies, 50)):>11} "
+              f"{format_ms(percentile(level.confirmation_latencies, 99)):>11} {level.unconfirmed:>11} "
+              f"{format_ms(percentile(level.turn_latencies, 99)):>9} {format_ms(percentile(level.lags, 99)):>8} "
+              f"{format_ms(max(level.lags, default=0.0)):>8} {level.memory_per_draft / 1024:>9.1f}")
+
+    within_targets = None
+    for level in results:
+        missed = level.missed_targets(args.confirmation_target, args.lag_target)
+        if missed:
+            print(f"{level.drafts} drafts missed targets: {', '.join(missed)}")
+            break
+        within_targets = level
+    if within_targets is None:
+        print("No level stayed within targets")
+    else:
+        print(f"Throughput limit: {within_targets.drafts} concurrent drafts, "
+              f"{within_targets.picks_per_second:.2f} picks/s within targets")
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Load tests many concurrent drafts against fake Discord and Sheets "
+                                                 "backends")
+    parser.add_argument("--drafts", default="10,25,50,100,200", help="Comma separated concurrent draft counts to run")
+    parser.add_argument("--drafters", type=int, default=8)
+    parser.add_argument("--teams", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--think-time", type=float, default=4.0, help="Max seconds a drafter waits before acting")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Seconds over which each level's drafts start")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds measured per level after ramp up")
+    parser.add_argument("--discord-latency", type=float, default=0.1, help="Mean seconds per Discord call")
+    parser.add_argument("--sheets-latency", type=float, default=0.3, help="Mean seconds per Sheets call")
+    parser.add_argument("--skip-rate", type=float, default=0.1)
+    parser.add_argument("--timeout-rate", type=float, default=0.05)
+    parser.add_argument("--late-pick-rate", type=float, default=0.5)
+    parser.add_argument("--journal-flush-delay", type=float, default=JOURNAL_FLUSH_DELAY)
+    parser.add_argument("--no-rate-limits", dest='rate_limits', action='store_false',
+                        help="Don't pace Discord calls, shows what the process could do without Discord's limits")
+    parser.add_argument("--confirmation-target", type=float, default=2.0,
+                        help="Max p99 seconds from a click to its confirmation")
+    parser.add_argument("--lag-target", type=float, default=0.1, help="Max p99 seconds of event loop lag")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--debug", action='store_true')
+    return parser
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING)
+    with tempfile.TemporaryDirectory() as work_dir:
+        args.work_dir = work_dir
+        os.chdir(work_dir)  # Pick journals are written relative to the working directory
+        asyncio.run(run_load_test(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+import contextvars
+import logging
+import logging.handlers
+import queue
+import sys
+
+# Logging for the bot, records are handed to a queue on the event loop and formatted and written by a listener thread
+
+LOG_FORMAT = '[{asctime}] [{levelname:<8}] {name} [{event_id} {pick_num}]: {message}'
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+DISCORD_LOG_LEVEL = logging.INFO
+
+# The draft whose task is logging, each draft runs in its own task so this is per draft
+draft_log_context: contextvars.ContextVar = contextvars.ContextVar('draft_log_context', default=None)
+
+
+class DraftContextFilter(logging.Filter):
+    """Adds the event ID and pick number of the draft doing the logging, or - outside of a draft"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        draft = draft_log_context.get()
+        record.event_id = draft.event_id if draft is not None else '-'
+        record.pick_num = draft.pick_num if draft is not None else '-'
+        return True
+
+
+def setup_logging(log_path: str, level: int | str = logging.INFO,
+                  discord_level: int | str = DISCORD_LOG_LEVEL) -> logging.handlers.QueueListener:
+    """Routes the bot's and discord.py's logs through a queue to a rotating log file and stdout
+
+    Only the message itself is built on the calling thread, and only for records at an enabled level. The returned
+    listener has to be stopped on exit to flush what is still queued.
+    """
+    formatter = logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT, style='{')
+    file_handler = logging.handlers.RotatingFileHandler(log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+                                                        encoding='utf-8')
+    stream_handler = logging.StreamHandler(sys.stdout)
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(DraftContextFilter())
+    for logger_name, logger_level in (('fantasy_first', level), ('discord', discord_level)):
+        logger = logging.getLogger(logger_name)
+        logger.setLevel(logger_level)
+        logger.addHandler(queue_handler)
+        logger.propagate = False
+
+    listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+    listener.start()
+    return listener
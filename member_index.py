@@ -0,0 +1,60 @@
+import logging
+
+import discord
+
+logger = logging.getLogger('fantasy_first')
+
+
+class MemberIndex:
+    """Per-guild nickname -> members index
+
+    Built with one pass over a guild's members the first time it is used, then kept current from the bot's member
+    join/update/remove events so drafter lookups never scan the member list.
+    """
+
+    def __init__(self):
+        self._guilds: dict[int, dict[str, list[discord.Member]]] = {}
+
+    def build(self, guild: discord.Guild) -> dict[str, list[discord.Member]]:
+        nick_index = {}
+        for member in guild.members:
+            if member.nick is not None:
+                nick_index.setdefault(member.nick, []).append(member)
+        self._guilds[guild.id] = nick_index
+        logger.debug("Indexed %s nicknames in %s", len(nick_index), guild.name)
+        return nick_index
+
+    def get(self, guild: discord.Guild, nick: str) -> list[discord.Member]:
+        """Every member with the nickname, nicknames aren't unique so callers pick the one they need"""
+        nick_index = self._guilds.get(guild.id)
+        if nick_index is None:
+            nick_index = self.build(guild)
+        return nick_index.get(nick, [])
+
+    def add(self, member: discord.Member):
+        nick_index = self._guilds.get(member.guild.id)
+        if nick_index is None or member.nick is None:
+            return
+        members = nick_index.setdefault(member.nick, [])
+        if member in members:
+            members[members.index(member)] = member  # Same member, keeps the latest copy of their roles etc.
+        else:
+            members.append(member)
+
+    def remove(self, member: discord.Member):
+        nick_index = self._guilds.get(member.guild.id)
+        if nick_index is None or member.nick is None:
+            return
+        members = nick_index.get(member.nick, [])
+        if member in members:
+            members.remove(member)
+            if not members:
+                del nick_index[member.nick]
+
+    def update(self, before: discord.Member, after: discord.Member):
+        if before.nick != after.nick:
+            self.remove(before)
+        self.add(after)
+
+    def forget_guild(self, guild: discord.Guild):
+        self._guilds.pop(guild.id, None)
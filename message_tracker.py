@@ -0,0 +1,127 @@
+import asyncio
+import datetime
+import functools
+import logging
+import time
+import typing
+
+import discord
+
+from outbound_queue import OutboundQueue, Priority, channel_bucket
+
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14) - datetime.timedelta(minutes=5)  # Discord rejects older messages
+BULK_DELETE_CHUNK_SIZE = 100
+SINGLE_DELETE_CONCURRENCY = 5
+
+logger = logging.getLogger('fantasy_first')
+
+
+async def delete_messages(msgs: typing.Iterable[discord.Message]) -> int:
+    """Deletes messages with as few API calls as possible, returning how many were deleted
+
+    Recent messages in guild channels are bulk deleted 100 at a time, anything else (DMs, messages older than two
+    weeks, or when the bot can't bulk delete) is deleted one by one, a few at a time.
+    """
+    bulk_by_channel: dict[int, list[discord.Message]] = {}
+    singles: list[discord.Message] = []
+    bulk_cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+    for msg in msgs:
+        if isinstance(msg.channel, discord.TextChannel) and msg.created_at > bulk_cutoff:
+            bulk_by_channel.setdefault(msg.channel.id, []).append(msg)
+        else:
+            singles.append(msg)
+
+    num_deleted = 0
+    for channel_msgs in bulk_by_channel.values():
+        channel = channel_msgs[0].channel
+        for chunk_start in range(0, len(channel_msgs), BULK_DELETE_CHUNK_SIZE):
+            chunk = channel_msgs[chunk_start:chunk_start + BULK_DELETE_CHUNK_SIZE]
+            try:
+                await channel.delete_messages(chunk)
+                num_deleted += len(chunk)
+            except discord.HTTPException as err:
+                logger.warning("Bulk delete in %s failed (%s), deleting %s messages individually", channel, err, len(chunk))
+                singles.extend(chunk)
+
+    semaphore = asyncio.Semaphore(SINGLE_DELETE_CONCURRENCY)
+
+    async def delete_single(msg: discord.Message) -> int:
+        async with semaphore:
+            try:
+                await msg.delete()
+            except discord.NotFound:
+                return 0  # Already gone
+            except discord.HTTPException as err:
+                logger.warning("Could not delete message %s: %s", msg.id, err)
+                return 0
+            return 1
+
+    num_deleted += sum(await asyncio.gather(*[delete_single(msg) for msg in singles]))
+    return num_deleted
+
+
+class MessageTracker:
+    """The messages a draft has posted, so they can be cleaned up together
+
+    Keeps the list methods the draft already used (append, extend, remove, clear) and adds bulk deletion. Given an
+    outbound queue, deletes go through it as background work behind any queued sends and edits.
+    """
+
+    def __init__(self, outbound: OutboundQueue = None):
+        self._msgs: dict[int, discord.Message] = {}
+        self.outbound = outbound
+
+    def append(self, msg: discord.Message):
+        self._msgs[msg.id] = msg
+
+    def extend(self, msgs: typing.Iterable[discord.Message]):
+        for msg in msgs:
+            self.append(msg)
+
+    def remove(self, msg: discord.Message):
+        del self._msgs[msg.id]
+
+    def clear(self):
+        self._msgs.clear()
+
+    def __contains__(self, msg: discord.Message) -> bool:
+        return msg.id in self._msgs
+
+    def __iter__(self) -> typing.Iterator[discord.Message]:
+        return iter(list(self._msgs.values()))
+
+    def __len__(self) -> int:
+        return len(self._msgs)
+
+    async def delete(self, msgs: typing.Iterable[discord.Message]) -> int:
+        """Deletes the given messages and stops tracking them"""
+        msgs = list(msgs)
+        for msg in msgs:
+            self._msgs.pop(msg.id, None)
+        if self.outbound is None:
+            return await delete_messages(msgs)
+
+        msgs_by_channel: dict[int, list[discord.Message]] = {}
+        for msg in msgs:
+            msgs_by_channel.setdefault(msg.channel.id, []).append(msg)
+        deletes = [self.outbound.submit(Priority.BACKGROUND, channel_bucket(channel_msgs[0].channel),
+                                        functools.partial(delete_messages, channel_msgs))
+                   for channel_msgs in msgs_by_channel.values()]
+        return sum(await asyncio.gather(*deletes))
+
+    def delete_later(self, msgs: typing.Iterable[discord.Message]):
+        """Stops tracking the messages and queues their deletion without waiting for it, needs an outbound queue"""
+        msgs_by_channel: dict[int, list[discord.Message]] = {}
+        for msg in msgs:
+            self._msgs.pop(msg.id, None)
+            msgs_by_channel.setdefault(msg.channel.id, []).append(msg)
+        for channel_msgs in msgs_by_channel.values():
+            self.outbound.post(Priority.BACKGROUND, channel_bucket(channel_msgs[0].channel),
+                               functools.partial(delete_messages, channel_msgs))
+
+    async def delete_all(self) -> int:
+        cleanup_start = time.perf_counter()
+        num_msgs = len(self._msgs)
+        num_deleted = await self.delete(self._msgs.values())
+        logger.info("Cleaned up %s/%s messages in %.2fs", num_deleted, num_msgs, time.perf_counter() - cleanup_start)
+        return num_deleted
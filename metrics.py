@@ -0,0 +1,234 @@
+import asyncio
+import bisect
+import contextlib
+import logging
+import threading
+import time
+import typing
+
+from aiohttp import web
+
+# Latency histograms and counters for the draft hot paths, exported in the Prometheus text format so slow picks can be
+# attributed to Sheets, Discord or the draft loop itself
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LOOP_LAG_INTERVAL = 0.5  # Seconds between event loop lag samples
+
+logger = logging.getLogger('fantasy_first')
+
+LabelValues = tuple[str, ...]
+
+
+class HistogramSeries:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()  # Sheets calls are observed from the worker threads
+
+    def observe(self, value: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextlib.contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def quantile(self, q: float) -> float:
+        """Estimated like Prometheus' histogram_quantile, interpolating within the bucket the quantile falls in"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for bucket_idx, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if bucket_idx == len(self.buckets):
+                    return self.buckets[-1]  # Past the last bucket, the best bound there is
+                lower = self.buckets[bucket_idx - 1] if bucket_idx > 0 else 0.0
+                return lower + (self.buckets[bucket_idx] - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+
+class CounterSeries:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.series: dict[LabelValues, typing.Any] = {}
+
+    def labels(self, *label_values: str):
+        series = self.series.get(label_values)
+        if series is None:
+            if len(label_values) != len(self.label_names):
+                raise ValueError(f"{self.name} takes labels {self.label_names}, got {label_values}")
+            series = self.series.setdefault(label_values, self._new_series())
+        return series
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def _label_str(self, label_values: LabelValues, extra: str = '') -> str:
+        labels = [f'{name}="{value}"' for name, value in zip(self.label_names, label_values)]
+        if extra:
+            labels.append(extra)
+        return f"{{{','.join(labels)}}}" if labels else ''
+
+    def collect(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = buckets
+
+    def _new_series(self) -> HistogramSeries:
+        return HistogramSeries(self.buckets)
+
+    def collect(self) -> list[str]:
+        lines = super().collect()
+        for label_values, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), series.counts):
+                cumulative += bucket_count
+                le_label = 'le="+Inf"' if bound == float('inf') else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{self._label_str(label_values, le_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_str(label_values)} {series.sum}")
+            lines.append(f"{self.name}_count{self._label_str(label_values)} {series.count}")
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def _new_series(self) -> CounterSeries:
+        return CounterSeries()
+
+    def collect(self) -> list[str]:
+        lines = [f"# HELP {self.name}_total {self.help_text}", f"# TYPE {self.name}_total {self.kind}"]
+        for label_values, series in sorted(self.series.items()):
+            lines.append(f"{self.name}_total{self._label_str(label_values)} {series.value}")
+        return lines
+
+
+class Gauge(Metric):
+    """Read when collected, from a function that returns the current value"""
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str, read: typing.Callable[[], float] = None):
+        super().__init__(name, help_text)
+        self.read = read
+
+    def collect(self) -> list[str]:
+        if self.read is None:
+            return []
+        return super().collect() + [f"{self.name} {self.read()}"]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: list[Metric] = []
+
+    def histogram(self, name: str, help_text: str, label_names: tuple[str, ...] = ()) -> Histogram:
+        return self._register(Histogram(name, help_text, label_names))
+
+    def counter(self, name: str, help_text: str, label_names: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_text, label_names))
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._register(Gauge(name, help_text))
+
+    def _register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        return '\n'.join(line for metric in self.metrics for line in metric.collect()) + '\n'
+
+    def summary(self) -> list[str]:
+        """One line per histogram series with its count, p50 and p99, for /draft_stats and the benchmarks"""
+        lines = []
+        for metric in self.metrics:
+            if not isinstance(metric, Histogram):
+                continue
+            for label_values, series in sorted(metric.series.items()):
+                if series.count == 0:
+                    continue
+                name = metric.name.removeprefix('ff_').removesuffix('_seconds')
+                if label_values:
+                    name += f"[{','.join(label_values)}]"
+                lines.append(f"{name:<34} {series.count:>7} {series.quantile(0.5) * 1000:>9.1f}ms "
+                             f"{series.quantile(0.99) * 1000:>9.1f}ms")
+        return lines
+
+
+registry = MetricsRegistry()
+
+sheets_request_seconds = registry.histogram(
+    'ff_sheets_request_seconds', "Google Sheets API call time on a worker thread", ('operation',))
+sheets_queue_seconds = registry.histogram(
+    'ff_sheets_queue_seconds', "Time a Sheets call waited for a free worker")
+sheets_errors = registry.counter('ff_sheets_errors', "Google Sheets API calls that raised", ('operation',))
+discord_request_seconds = registry.histogram(
+    'ff_discord_request_seconds', "Discord API request time for queued sends, edits and deletes", ('operation',))
+discord_queue_seconds = registry.histogram(
+    'ff_discord_queue_seconds', "Time a Discord request waited in the outbound queue", ('priority',))
+discord_errors = registry.counter('ff_discord_errors', "Discord requests that failed", ('operation', 'status'))
+interaction_ack_seconds = registry.histogram(
+    'ff_interaction_ack_seconds', "Time from a component callback starting to the interaction being acknowledged",
+    ('component',))
+render_seconds = registry.histogram('ff_render_seconds', "Time to render draft messages", ('component',))
+draft_action_seconds = registry.histogram(
+    'ff_draft_action_seconds', "Time the draft loop spends handling a pick, skip or timeout, not counting sends it "
+                               "waits on", ('action',))
+event_loop_lag_seconds = registry.histogram(
+    'ff_event_loop_lag_seconds', "How late the event loop runs a task that should have woken up")
+outbound_queue_depth = registry.gauge('ff_outbound_queue_depth', "Discord requests waiting to be sent")
+running_drafts = registry.gauge('ff_running_drafts', "Drafts running or waiting to restart")
+
+
+async def monitor_loop_lag(interval: float = LOOP_LAG_INTERVAL):
+    """Samples event loop lag until cancelled"""
+    while True:
+        sleep_start = time.perf_counter()
+        await asyncio.sleep(interval)
+        event_loop_lag_seconds.labels().observe(max(0.0, time.perf_counter() - sleep_start - interval))
+
+
+async def start_metrics_server(host: str, port: int) -> web.AppRunner:
+    """Serves /metrics for Prometheus to scrape, the caller cleans up the returned runner"""
+
+    async def handle_metrics(request: web.Request) -> web.Response:
+        return web.Response(text=registry.render(), content_type='text/plain', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info("Serving metrics on http://%s:%s/metrics", host, port)
+    return runner
@@ -0,0 +1,243 @@
+import asyncio
+import enum
+import heapq
+import itertools
+import logging
+import time
+import typing
+
+import discord
+
+import metrics
+
+# Discord's limits are per route and not published exactly, these stay under the commonly observed ones
+CHANNEL_BUCKET_CAPACITY = 5  # Writes per channel (or DM) ...
+CHANNEL_BUCKET_PERIOD = 5.0  # ... per this many seconds
+GLOBAL_REQUESTS_PER_SECOND = 45  # Discord's global limit is 50
+
+logger = logging.getLogger('fantasy_first')
+
+BucketKey = typing.Hashable
+RequestFactory = typing.Callable[[], typing.Awaitable]
+
+
+class Priority(enum.IntEnum):
+    URGENT = 0  # Drafter pings and pick confirmations
+    NORMAL = 1  # Grid and pick table edits, reminders, draft setup
+    BACKGROUND = 2  # Cleanup deletes
+
+
+def channel_bucket(channel: discord.abc.Messageable) -> BucketKey:
+    return 'channel', channel.id
+
+
+def user_bucket(user: discord.abc.User) -> BucketKey:
+    """DMs to a user, keyed by user since the DM channel may not exist yet"""
+    return 'user', user.id
+
+
+def request_operation(factory: RequestFactory) -> str:
+    """Metrics label for a request, the name of the function it calls, ex. send or edit"""
+    return getattr(getattr(factory, 'func', factory), '__name__', 'request')
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, period: float):
+        self.capacity = capacity
+        self.refill_rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available, 0 if one is available now"""
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        return max(0.0, (1 - self.tokens) / self.refill_rate)
+
+    def take(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+    def pause(self, seconds: float):
+        """Used after a 429, nothing goes out on this bucket until retry_after has passed"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+
+class OutboundRequest:
+    def __init__(self, priority: Priority, seq: int, bucket_key: BucketKey, factory: RequestFactory,
+                 coalesce_key: typing.Hashable = None, operation: str = None):
+        self.priority = priority
+        self.seq = seq
+        self.bucket_key = bucket_key
+        self.factory = factory
+        self.coalesce_key = coalesce_key
+        self.operation = operation or request_operation(factory)
+        self.queued_at = time.perf_counter()
+        self.futures: list[asyncio.Future] = []
+
+    def __lt__(self, other: 'OutboundRequest') -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class OutboundQueue:
+    """Process-wide queue for Discord writes, ordered by priority and paced per rate limit bucket
+
+    Each bucket (a channel or a user's DMs) sends one request at a time, most urgent first, and only when its own
+    token bucket and the global one have room, so a burst of cleanup in one draft can't delay the next drafter's ping.
+    Requests submitted with a coalesce key replace a queued request with the same key, ex. pick table edits only
+    send the latest table.
+    """
+
+    def __init__(self, bucket_capacity: int = CHANNEL_BUCKET_CAPACITY, bucket_period: float = CHANNEL_BUCKET_PERIOD,
+                 global_per_second: float = GLOBAL_REQUESTS_PER_SECOND):
+        self.bucket_capacity = bucket_capacity
+        self.bucket_period = bucket_period
+        self._global_bucket = TokenBucket(global_per_second, 1.0)
+        self._buckets: dict[BucketKey, TokenBucket] = {}
+        self._queued: dict[BucketKey, list[OutboundRequest]] = {}
+        self._in_flight: set[BucketKey] = set()
+        self._coalescing: dict[typing.Hashable, OutboundRequest] = {}
+        self._counter = itertools.count()
+        self._wake: asyncio.Event = None
+        self._task: asyncio.Task = None
+        self._request_tasks: set[asyncio.Task] = set()
+
+    def set_rate_limits(self, bucket_capacity: int, bucket_period: float, global_per_second: float):
+        """Changes the pacing of every bucket, ex. to take it out of an offline benchmark"""
+        self.bucket_capacity = bucket_capacity
+        self.bucket_period = bucket_period
+        self._global_bucket = TokenBucket(global_per_second, 1.0)
+        self._buckets.clear()
+
+    def submit(self, priority: Priority, bucket_key: BucketKey, factory: RequestFactory,
+               coalesce_key: typing.Hashable = None, operation: str = None) -> asyncio.Future:
+        """Queues a request, returning a future for its result"""
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(priority, bucket_key, factory, coalesce_key, operation).futures.append(future)
+        return future
+
+    def post(self, priority: Priority, bucket_key: BucketKey, factory: RequestFactory,
+             coalesce_key: typing.Hashable = None, operation: str = None):
+        """Queues a request nobody waits on, failures are only logged"""
+        self._enqueue(priority, bucket_key, factory, coalesce_key, operation)
+
+    def _enqueue(self, priority: Priority, bucket_key: BucketKey, factory: RequestFactory,
+                 coalesce_key: typing.Hashable, operation: str) -> OutboundRequest:
+        if coalesce_key is not None and coalesce_key in self._coalescing:
+            request = self._coalescing[coalesce_key]
+            request.factory = factory  # Still queued, the newer request supersedes it
+            if priority < request.priority:  # Goes out as soon as the most urgent of the requests it replaced would
+                request.priority = priority
+                heapq.heapify(self._queued[request.bucket_key])
+            return request
+
+        request = OutboundRequest(priority, next(self._counter), bucket_key, factory, coalesce_key, operation)
+        if coalesce_key is not None:
+            self._coalescing[coalesce_key] = request
+        heapq.heappush(self._queued.setdefault(bucket_key, []), request)
+        self._ensure_running()
+        self._wake.set()
+        return request
+
+    def __len__(self) -> int:
+        return sum(len(requests) for requests in self._queued.values())
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def _bucket(self, bucket_key: BucketKey) -> TokenBucket:
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            bucket = self._buckets[bucket_key] = TokenBucket(self.bucket_capacity, self.bucket_period)
+        return bucket
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            now = time.monotonic()
+            timeout = None
+
+            # The most urgent request at the head of each idle bucket, most urgent first across buckets
+            ready = []
+            for bucket_key, requests in self._queued.items():
+                if bucket_key in self._in_flight:
+                    continue
+                wait_time = self._bucket(bucket_key).wait_time(now)
+                if wait_time > 0:
+                    timeout = wait_time if timeout is None else min(timeout, wait_time)
+                    continue
+                ready.append(requests[0])
+            ready.sort()
+
+            for request in ready:
+                global_wait = self._global_bucket.wait_time(now)
+                if global_wait > 0:
+                    timeout = global_wait if timeout is None else min(timeout, global_wait)
+                    break
+                self._global_bucket.take(now)
+                self._bucket(request.bucket_key).take(now)
+                self._start(request)
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _start(self, request: OutboundRequest):
+        requests = self._queued[request.bucket_key]
+        heapq.heappop(requests)
+        if not requests:
+            del self._queued[request.bucket_key]
+        if request.coalesce_key is not None:
+            del self._coalescing[request.coalesce_key]
+        self._in_flight.add(request.bucket_key)
+        task = asyncio.create_task(self._send(request))
+        self._request_tasks.add(task)
+        task.add_done_callback(self._request_tasks.discard)
+
+    async def _send(self, request: OutboundRequest):
+        if request.futures and all(future.cancelled() for future in request.futures):
+            # Everyone waiting gave up (ex. the draft was stopped), so a message would only be orphaned
+            self._in_flight.discard(request.bucket_key)
+            self._wake.set()
+            return
+        metrics.discord_queue_seconds.labels(request.priority.name.lower()).observe(
+            time.perf_counter() - request.queued_at)
+        try:
+            with metrics.discord_request_seconds.labels(request.operation).time():
+                result = await request.factory()
+        except asyncio.CancelledError:
+            for future in request.futures:
+                future.cancel()
+            raise
+        except Exception as err:
+            metrics.discord_errors.labels(request.operation, str(getattr(err, 'status', 'error'))).inc()
+            if isinstance(err, discord.HTTPException) and err.status == 429:
+                retry_after = getattr(err, 'retry_after', None) or self.bucket_period
+                self._bucket(request.bucket_key).pause(retry_after)
+                logger.warning("Rate limited on %s, pausing it for %.1fs", request.bucket_key, retry_after)
+            if not request.futures:
+                logger.warning("Discord request on %s failed: %r", request.bucket_key, err)
+            for future in request.futures:
+                if not future.done():
+                    future.set_exception(err)
+        else:
+            for future in request.futures:
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._in_flight.discard(request.bucket_key)
+            self._wake.set()
+
+
+outbound_queue = OutboundQueue()
+metrics.outbound_queue_depth.read = outbound_queue.__len__
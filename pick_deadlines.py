@@ -0,0 +1,105 @@
+import datetime
+import typing
+from dataclasses import dataclass
+
+import numpy as np
+
+# Picks landing within this much of the end of an active day stay on that day, accounts for rounding
+DAY_BOUNDARY_TOLERANCE_US = 1_000_000
+US_PER_SECOND = 1_000_000
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+ActiveWindow = tuple[datetime.time, datetime.time]
+
+
+@dataclass
+class DeadlineSchedule:
+    draft_start: datetime.datetime
+    draft_end: datetime.datetime  # Clipped to the end of the last day's active hours
+    total_draft_time: datetime.timedelta
+    time_per_pick: datetime.timedelta
+    deadlines: list[datetime.datetime]
+    day_lengths: list[datetime.timedelta]
+
+
+def to_microseconds(moment: datetime.datetime) -> int:
+    """Exact POSIX timestamp in integer microseconds, floats can't hold a timedelta's precision"""
+    return (moment - EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def from_microseconds(timestamp_us: int, tz: datetime.tzinfo) -> datetime.datetime:
+    return (EPOCH + datetime.timedelta(microseconds=timestamp_us)).astimezone(tz)
+
+
+def active_day_windows(draft_start: datetime.datetime, draft_end: datetime.datetime, tz: datetime.tzinfo,
+                       default_window: ActiveWindow,
+                       day_windows: typing.Mapping[datetime.date, ActiveWindow] = None
+                       ) -> tuple[np.ndarray, np.ndarray, datetime.datetime]:
+    """Usable active time of each draft day as (start timestamps, lengths), both int64 microseconds, and the clipped
+    draft end
+
+    The first day starts at the draft start (if it falls inside active hours) and the last day ends at the draft
+    end, every day in between is a full active window. day_windows overrides the active hours for specific dates.
+    """
+    day_windows = day_windows or {}
+    start_date = draft_start.astimezone(tz).date()
+    end_date = draft_end.astimezone(tz).date()
+    num_days = max(1, (end_date - start_date).days + 1)
+
+    window_starts = np.empty(num_days, dtype=np.int64)
+    window_ends = np.empty(num_days, dtype=np.int64)
+    for day_idx in range(num_days):
+        date = start_date + datetime.timedelta(days=day_idx)
+        window_start_time, window_end_time = day_windows.get(date, default_window)
+        window_starts[day_idx] = to_microseconds(datetime.datetime.combine(date, window_start_time, tzinfo=tz))
+        window_ends[day_idx] = to_microseconds(datetime.datetime.combine(date, window_end_time, tzinfo=tz))
+
+    clipped_end = min(to_microseconds(draft_end), int(window_ends[-1]))
+    # Clamp the start and end into their day's active window, ex. a 7am start counts from when active hours begin
+    window_starts[0] = min(window_ends[0], max(window_starts[0], to_microseconds(draft_start)))
+    window_ends[-1] = min(window_ends[-1], max(window_starts[-1], clipped_end))
+
+    day_lengths = np.maximum(window_ends - window_starts, 0)
+    return window_starts, day_lengths, from_microseconds(clipped_end, tz)
+
+
+def snap_timestamps(timestamps_us: np.ndarray, snap_minutes: int) -> np.ndarray:
+    """Rounds microsecond timestamps to the nearest snap interval, exactly halfway rounds up, ex. 3:08 -> 3:15 with 15
+    minutes"""
+    if not snap_minutes:
+        return timestamps_us
+    interval = snap_minutes * 60 * US_PER_SECOND
+    discard = timestamps_us % interval
+    return timestamps_us - discard + np.where(discard * 2 >= interval, interval, 0)
+
+
+def compute_pick_deadlines(draft_start: datetime.datetime, draft_end: datetime.datetime, num_picks: int,
+                           tz: datetime.tzinfo, default_window: ActiveWindow, snap_minutes: int = 0,
+                           day_windows: typing.Mapping[datetime.date, ActiveWindow] = None) -> DeadlineSchedule:
+    """Spreads num_picks deadlines evenly over the active hours between draft_start and draft_end
+
+    Pick k's deadline is k * time_per_pick into the cumulative active time, mapped back to a wall clock time by a
+    binary search of the cumulative day lengths, so all deadlines come out of a few array operations. The math is in
+    integer microseconds like the timedeltas it replaced, so deadlines that land exactly halfway between two snap
+    intervals round the same way.
+    """
+    window_starts, day_lengths, clipped_end = active_day_windows(draft_start, draft_end, tz, default_window,
+                                                                 day_windows)
+    total_draft_time = datetime.timedelta(microseconds=int(day_lengths.sum()))
+    time_per_pick = total_draft_time / num_picks if num_picks > 0 else total_draft_time
+    time_per_pick_us = time_per_pick // datetime.timedelta(microseconds=1)
+
+    pick_points = np.arange(1, num_picks + 1, dtype=np.int64) * time_per_pick_us
+    day_ends = np.cumsum(day_lengths)
+    day_idxs = np.minimum(np.searchsorted(day_ends, pick_points - DAY_BOUNDARY_TOLERANCE_US, side='left'),
+                          len(day_lengths) - 1)
+    day_offsets = day_ends[day_idxs] - day_lengths[day_idxs]
+    deadline_timestamps = snap_timestamps(window_starts[day_idxs] + (pick_points - day_offsets), snap_minutes)
+
+    return DeadlineSchedule(
+        draft_start=draft_start,
+        draft_end=clipped_end,
+        total_draft_time=total_draft_time,
+        time_per_pick=time_per_pick,
+        deadlines=[from_microseconds(timestamp, tz) for timestamp in deadline_timestamps.tolist()],
+        day_lengths=[datetime.timedelta(microseconds=length) for length in day_lengths.tolist()])
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import typing
+
+from sheet_access import AsyncWorksheet
+
+JOURNAL_FLUSH_DELAY = 2.0  # Seconds to wait for more picks before flushing, so bursts share one batch
+JOURNAL_MIN_BACKOFF = 1.0
+JOURNAL_MAX_BACKOFF = 300.0
+
+logger = logging.getLogger('fantasy_first')
+
+Cell = tuple[int, int]
+
+
+class PickJournal:
+    """Write-behind queue for pick cells
+
+    Every write is appended to a local journal file right away and then flushed to the sheet in coalesced batch
+    updates, retrying with backoff, so the draft never waits on Sheets. Writes that were journaled but not flushed
+    before a restart are picked back up by load(). The appends of one event loop pass share a single fsync, which
+    runs in the default executor so the disk never stalls the loop.
+    """
+
+    def __init__(self, event_page: AsyncWorksheet, journal_path: str, flush_delay: float = JOURNAL_FLUSH_DELAY):
+        self.event_page = event_page
+        self.journal_path = journal_path
+        self.flush_delay = flush_delay
+        self.pending: dict[Cell, typing.Any] = {}
+        self._journal_file = None
+        self._sync_task: asyncio.Task = None  # Waiting to fsync the entries appended in this loop pass
+        self._syncing: set[asyncio.Task] = set()
+        self._wake = asyncio.Event()
+        self._flush_task: asyncio.Task = None
+        self._closing = False
+
+    def load(self) -> dict[Cell, typing.Any]:
+        """Replays the journal file, returning the writes that never made it to the sheet"""
+        self.pending.clear()
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as journal_file:
+                for line in journal_file:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning("Skipping corrupt journal line in %s: %r", self.journal_path, line)
+                        continue
+                    cell = tuple(entry['cell'])
+                    if entry['op'] == 'write':
+                        self.pending[cell] = entry['value']
+                    elif entry['op'] == 'flushed' and self.pending.get(cell) == entry['value']:
+                        del self.pending[cell]
+        if self.pending:
+            logger.info("Recovered %s unflushed picks for %s", len(self.pending), self.event_page.title)
+        return dict(self.pending)
+
+    def start(self):
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        if self.pending:
+            self._wake.set()
+
+    def record(self, cell: Cell, value):
+        """Journals a cell write and schedules it to be flushed, without waiting on the sheet"""
+        self._append({'op': 'write', 'cell': list(cell), 'value': value, 'time': time.time()})
+        self.pending[cell] = value
+        self._wake.set()
+
+    async def close(self, timeout: float = 30.0):
+        """Stops the flusher after trying to get all pending writes onto the sheet"""
+        self._closing = True
+        self._wake.set()
+        if self._flush_task is not None:
+            try:
+                await asyncio.wait_for(self._flush_task, timeout)
+            except asyncio.TimeoutError:
+                logger.warning("%s picks for %s are still unflushed, they remain in %s",
+                               len(self.pending), self.event_page.title, self.journal_path)
+            self._flush_task = None
+        await self._synced()
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+    def _append(self, entry: dict):
+        if self._journal_file is None:
+            os.makedirs(os.path.dirname(self.journal_path) or '.', exist_ok=True)
+            self._journal_file = open(self.journal_path, 'a', encoding='utf-8')
+        self._journal_file.write(json.dumps(entry) + '\n')
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync())
+            self._syncing.add(self._sync_task)
+            self._sync_task.add_done_callback(self._syncing.discard)
+
+    async def _sync(self):
+        """Gets everything appended up to now onto disk, entries appended while the fsync runs wait for the next one"""
+        self._sync_task = None
+        journal_file = self._journal_file
+        try:
+            journal_file.flush()  # Hands the entries to the OS in the order they were appended
+            await asyncio.get_running_loop().run_in_executor(None, os.fsync, journal_file.fileno())
+        except OSError as err:
+            logger.error("Syncing %s to disk failed: %r", self.journal_path, err)
+
+    async def _synced(self):
+        """Waits for the fsyncs of everything appended so far, the journal file can't be closed under them"""
+        while self._syncing:
+            await asyncio.wait(self._syncing)  # Not gather, being cancelled mustn't cancel an fsync already running
+
+    def _compact(self):
+        # Nothing left to recover, so the journal can start over
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+        open(self.journal_path, 'w', encoding='utf-8').close()
+
+    async def _flush_loop(self):
+        backoff = JOURNAL_MIN_BACKOFF
+        while True:
+            if not self.pending:
+                if self._closing:
+                    return
+                await self._wake.wait()
+                self._wake.clear()
+                continue
+
+            if not self._closing:
+                await asyncio.sleep(self.flush_delay)  # Let a burst of picks collect into one batch
+
+            batch = dict(self.pending)
+            try:
+                await self.event_page.update_values(batch)
+            except Exception as err:
+                logger.warning("Flushing %s picks to %s failed (%r), retrying in %.0fs",
+                               len(batch), self.event_page.title, err, backoff)
+                await asyncio.sleep(backoff * random.uniform(0.5, 1.0))
+                backoff = min(backoff * 2, JOURNAL_MAX_BACKOFF)
+                continue
+
+            backoff = JOURNAL_MIN_BACKOFF
+            for cell, value in batch.items():
+                self._append({'op': 'flushed', 'cell': list(cell), 'value': value, 'time': time.time()})
+                if self.pending.get(cell) == value:  # May have been overwritten while flushing
+                    del self.pending[cell]
+            logger.debug("Flushed %s picks to %s", len(batch), self.event_page.title)
+            if not self.pending:
+                await self._synced()
+                if not self.pending:  # No new picks came in while waiting
+                    self._compact()
@@ -0,0 +1,66 @@
+import datetime
+
+import discord
+
+import metrics
+
+DATE_STRING_WIDTH = 21
+DEADLINE_FORMAT = '%a. %b %d %I:%M%p'
+
+
+class PickTableRenderer:
+    """Fixed width table of picks and deadlines for the draft channel
+
+    Each drafter's row is cached as a string and only rebuilt when one of its cells changes, and the message is only
+    edited when the rendered content differs from what was last sent.
+    """
+
+    def __init__(self, drafter_names: list[str], num_rounds: int, cell_width: int = DATE_STRING_WIDTH):
+        self.drafter_names = drafter_names
+        self.num_rounds = num_rounds
+        self.cell_width = cell_width
+        self.name_width = max([len(name) for name in drafter_names], default=0)
+        self.drafter_idxs = {name: idx for idx, name in enumerate(drafter_names)}
+        self.cells = [[f"|{'':^{cell_width}}"] * num_rounds for _ in drafter_names]
+        self.rows = [self._render_row(drafter_idx) for drafter_idx in range(len(drafter_names))]
+
+        round_title_str = '|'.join([f"{f'Round {round_num + 1}':^{cell_width}}" for round_num in range(num_rounds)])
+        title_line = f"{'Name':^{self.name_width + 1}}|{round_title_str}"
+        self.title_lines = f"```\n{title_line}\n{'-' * len(title_line)}\n"
+
+        self._content: str | None = None
+        self.sent_content: str | None = None
+
+    def _render_row(self, drafter_idx: int) -> str:
+        return f"{self.drafter_names[drafter_idx]:>{self.name_width}} {''.join(self.cells[drafter_idx])}\n"
+
+    def set_cell(self, drafter_name: str, round_num: int, cell_str: str) -> bool:
+        """Replaces one cell, returning whether anything changed"""
+        drafter_idx = self.drafter_idxs[drafter_name]
+        if self.cells[drafter_idx][round_num] == cell_str:
+            return False
+        self.cells[drafter_idx][round_num] = cell_str
+        self.rows[drafter_idx] = self._render_row(drafter_idx)
+        self._content = None
+        return True
+
+    def set_pick(self, drafter_name: str, round_num: int, team_num) -> bool:
+        return self.set_cell(drafter_name, round_num, f"|{team_num:^{self.cell_width}}")
+
+    def set_deadline(self, drafter_name: str, round_num: int, deadline: datetime.datetime) -> bool:
+        return self.set_cell(drafter_name, round_num, f"| {deadline.strftime(DEADLINE_FORMAT)} ")
+
+    def render(self) -> str:
+        if self._content is None:
+            with metrics.render_seconds.labels('pick_table').time():
+                self._content = f"{self.title_lines}{''.join(self.rows)}```"
+        return self._content
+
+    async def update_message(self, msg: discord.Message) -> bool:
+        """Edits the table message if the table changed since it was last sent, returning whether it was edited"""
+        content = self.render()
+        if content == self.sent_content:
+            return False
+        await msg.edit(content=content)
+        self.sent_content = content
+        return True
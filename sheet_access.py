@@ -0,0 +1,130 @@
+import asyncio
+import concurrent.futures
+import functools
+import threading
+import time
+import typing
+
+import pygsheets
+from google.oauth2 import service_account
+from pygsheets.utils import format_addr
+
+import metrics
+
+SHEETS_MAX_WORKERS = 4
+SHEETS_SCOPES = ('https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive')
+
+CellAddress = typing.Union[str, tuple[int, int]]
+
+
+def a1_label(addr: CellAddress) -> str:
+    """Converts a (row, col) tuple or label to an A1 label"""
+    if isinstance(addr, str):
+        return addr
+    return format_addr(addr, output='label')
+
+
+def a1_range(page_title: str, start: CellAddress, end: CellAddress = None) -> str:
+    """A1 notation for a cell or range on the given page, quoting the title as the Sheets API expects"""
+    escaped_title = page_title.replace("'", "''")
+    if end is None:
+        return f"'{escaped_title}'!{a1_label(start)}"
+    return f"'{escaped_title}'!{a1_label(start)}:{a1_label(end)}"
+
+
+class AsyncSheets:
+    """Runs Google Sheets requests on a worker pool so they never block the event loop"""
+
+    def __init__(self, client_factory: typing.Callable[[], pygsheets.client.Client],
+                 max_workers: int = SHEETS_MAX_WORKERS):
+        self._client_factory = client_factory
+        self._local = threading.local()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sheets')
+
+    @classmethod
+    def from_service_account(cls, service_account_file: str, max_workers: int = SHEETS_MAX_WORKERS):
+        """Every worker's client shares one set of credentials, so the key file is read and the access token is
+        refreshed once for the pool, and the clients serve any spreadsheet the service account can open"""
+        credentials = service_account.Credentials.from_service_account_file(service_account_file, scopes=SHEETS_SCOPES)
+        return cls(functools.partial(pygsheets.authorize, custom_credentials=credentials), max_workers)
+
+    def _client(self) -> pygsheets.client.Client:
+        # httplib2 connections are not thread safe, so each worker keeps its own authorized client
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._client_factory()
+            self._local.client = client
+        return client
+
+    def _call(self, operation: str, queued_at: float, func, *args):
+        metrics.sheets_queue_seconds.labels().observe(time.perf_counter() - queued_at)
+        try:
+            with metrics.sheets_request_seconds.labels(operation).time():
+                return func(self._client(), *args)
+        except Exception:
+            metrics.sheets_errors.labels(operation).inc()
+            raise
+
+    async def run(self, func: typing.Callable[..., typing.Any], *args, operation: str = 'other'):
+        """Runs func(client, *args) on a worker thread with that thread's client"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self._call, operation, time.perf_counter(),
+                                                                            func, *args))
+
+    async def get_ranges(self, spreadsheet_id: str, ranges: list[str],
+                         value_render=pygsheets.ValueRenderOption.FORMATTED_VALUE) -> list[list[list]]:
+        """Reads several A1 ranges in one request, returning a matrix per range"""
+        value_ranges = await self.run(
+            lambda client: client.sheet.values_batch_get(spreadsheet_id, ranges, value_render_option=value_render),
+            operation='batch_get')
+        return [value_range.get('values', []) for value_range in value_ranges]
+
+    async def update_ranges(self, spreadsheet_id: str, updates: dict[str, list[list]], parse=True):
+        """Writes several A1 ranges in one request"""
+        if not updates:
+            return
+        data = [{'dataFilter': {'a1Range': value_range}, 'values': values, 'majorDimension': 'ROWS'}
+                for value_range, values in updates.items()]
+        await self.run(
+            lambda client: client.sheet.values_batch_update_by_data_filter(spreadsheet_id, data, parse),
+            operation='batch_update')
+
+    def worksheet(self, worksheet: pygsheets.Worksheet) -> 'AsyncWorksheet':
+        return AsyncWorksheet(self, worksheet)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class AsyncWorksheet:
+    """Awaitable view of a single worksheet, mirroring the pygsheets calls used by drafts"""
+
+    def __init__(self, sheets: AsyncSheets, worksheet: pygsheets.Worksheet):
+        self.sheets = sheets
+        self.worksheet = worksheet
+        self.spreadsheet_id = worksheet.spreadsheet.id
+        self.title = worksheet.title
+        self.url = worksheet.url
+
+    def range(self, start: CellAddress, end: CellAddress = None) -> str:
+        return a1_range(self.title, start, end)
+
+    async def get_values(self, start: tuple[int, int], end: tuple[int, int],
+                         value_render=pygsheets.ValueRenderOption.FORMATTED_VALUE) -> list[list]:
+        values, = await self.sheets.get_ranges(self.spreadsheet_id, [self.range(start, end)], value_render)
+        # Pad empty cells within the returned rows, matching Worksheet.get_values
+        width = end[1] - start[1] + 1
+        return [row + [''] * (width - len(row)) for row in values]
+
+    async def get_value(self, addr: CellAddress, value_render=pygsheets.ValueRenderOption.FORMATTED_VALUE):
+        values, = await self.sheets.get_ranges(self.spreadsheet_id, [self.range(addr)], value_render)
+        if values and values[0]:
+            return values[0][0]
+        return ''
+
+    async def update_value(self, addr: CellAddress, value):
+        await self.sheets.update_ranges(self.spreadsheet_id, {self.range(addr): [[value]]})
+
+    async def update_values(self, cell_values: dict[CellAddress, typing.Any]):
+        await self.sheets.update_ranges(self.spreadsheet_id,
+                                        {self.range(addr): [[value]] for addr, value in cell_values.items()})
@@ -0,0 +1,256 @@
+import asyncio
+import csv
+import logging
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+import numpy as np
+import pygsheets
+
+from draft import NUM_PICKS, drafters_range, parse_drafter_rows
+from event_registry import EventRegistry
+from sheet_access import AsyncSheets
+
+TEAM_RESULTS_PATH = 'team_results.csv'  # event_id,team,points rows, one per team that scored at an event
+PICKS_MAX_AGE = 5 * 60  # Seconds before /standings rereads the picks from the event pages
+TEAM_KEY_SPAN = 1 << 20  # Above any team number, so event_idx * span + team is a unique key
+
+logger = logging.getLogger('fantasy_first')
+
+
+def load_team_results(path: str) -> dict[str, dict[int, float]]:
+    """Fantasy points of each team keyed by event ID, from a CSV with event_id, team and points columns"""
+    results: dict[str, dict[int, float]] = defaultdict(dict)
+    with open(path, newline='', encoding='utf-8') as results_file:
+        for row in csv.DictReader(results_file):
+            results[row['event_id'].strip()][int(row['team'])] = float(row['points'])
+    return dict(results)
+
+
+@dataclass
+class EventScores:
+    """One event's picks as arrays, with the score of each row for incremental updates"""
+    drafter_idxs: np.ndarray  # (drafters,) index into the season's drafter list
+    picks: np.ndarray  # (drafters, rounds) team numbers, 0 where not picked
+    row_scores: np.ndarray  # (drafters,) points each drafter scored at the event
+
+
+class StandingsEngine:
+    """Season standings of every drafter across every event, kept in NumPy arrays
+
+    load() scores all events in one vectorized pass, after which a change to one event's picks or results only
+    rescores that event and applies the difference to the season totals.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.drafter_names: list[str] = []
+        self.drafter_idxs: dict[str, int] = {}
+        self.totals = np.zeros(0)
+        self.events_drafted = np.zeros(0, dtype=np.int64)
+        self.events: dict[str, EventScores] = {}
+        self.results: dict[str, tuple[np.ndarray, np.ndarray]] = {}  # Sorted team numbers and their points
+
+    def _drafter_idx_array(self, drafter_names: list[str]) -> np.ndarray:
+        for name in drafter_names:
+            if name not in self.drafter_idxs:
+                self.drafter_idxs[name] = len(self.drafter_names)
+                self.drafter_names.append(name)
+        if len(self.drafter_names) > len(self.totals):
+            self.totals = np.pad(self.totals, (0, len(self.drafter_names) - len(self.totals)))
+            self.events_drafted = np.pad(self.events_drafted, (0, len(self.drafter_names) - len(self.events_drafted)))
+        return np.array([self.drafter_idxs[name] for name in drafter_names], dtype=np.int64)
+
+    @staticmethod
+    def _picks_array(draft_cells: list[list[None | int]], num_rounds: int) -> np.ndarray:
+        picks = np.zeros((len(draft_cells), num_rounds), dtype=np.int64)
+        for drafter_idx, cells in enumerate(draft_cells):
+            for round_num, team in enumerate(cells[:num_rounds]):
+                if isinstance(team, (int, float)) or (isinstance(team, str) and team.isdigit()):
+                    picks[drafter_idx, round_num] = int(team)
+        return picks
+
+    @staticmethod
+    def _results_arrays(team_points: dict[int, float]) -> tuple[np.ndarray, np.ndarray]:
+        teams = np.array(sorted(team_points), dtype=np.int64)
+        return teams, np.array([team_points[team] for team in teams], dtype=np.float64)
+
+    def load(self, event_picks: dict[str, tuple[list[str], list[list[None | int]]]],
+             results: dict[str, dict[int, float]]):
+        """Replaces everything, scoring every (event, drafter, round) pick against the results at once"""
+        self.clear()
+        num_rounds = max([NUM_PICKS] + [len(cells) for _, draft_cells in event_picks.values() for cells in draft_cells])
+        event_ids = list(event_picks)
+        for event_id in event_ids:
+            drafter_names, draft_cells = event_picks[event_id]
+            self.events[event_id] = EventScores(self._drafter_idx_array(drafter_names),
+                                                self._picks_array(draft_cells, num_rounds),
+                                                np.zeros(len(drafter_names)))
+        for event_id, team_points in results.items():
+            self.results[event_id] = self._results_arrays(team_points)
+        if not event_ids:
+            return
+
+        # Every pick of the season keyed by event_idx * span + team, looked up in the results keyed the same way
+        row_event_idxs = np.concatenate([np.full(len(self.events[event_id].drafter_idxs), event_idx, dtype=np.int64)
+                                         for event_idx, event_id in enumerate(event_ids)])
+        picks = np.concatenate([self.events[event_id].picks for event_id in event_ids])
+        pick_keys = row_event_idxs[:, None] * TEAM_KEY_SPAN + picks
+        result_keys, result_points = [], []
+        for event_idx, event_id in enumerate(event_ids):
+            if event_id in self.results:
+                teams, points = self.results[event_id]
+                result_keys.append(event_idx * TEAM_KEY_SPAN + teams)
+                result_points.append(points)
+        row_scores = np.zeros(len(picks))
+        if result_keys:
+            result_keys = np.concatenate(result_keys)
+            result_points = np.concatenate(result_points)  # Keys are sorted, events are in order and teams sorted
+            row_scores = self._lookup(pick_keys, picks, result_keys, result_points).sum(axis=1)
+
+        drafter_idxs = np.concatenate([self.events[event_id].drafter_idxs for event_id in event_ids])
+        self.totals = np.bincount(drafter_idxs, weights=row_scores, minlength=len(self.drafter_names))
+        self.events_drafted = np.bincount(drafter_idxs, minlength=len(self.drafter_names))
+        row_start = 0
+        for event_id in event_ids:
+            event = self.events[event_id]
+            event.row_scores = row_scores[row_start:row_start + len(event.drafter_idxs)]
+            row_start += len(event.drafter_idxs)
+
+    @staticmethod
+    def _lookup(keys: np.ndarray, picks: np.ndarray, sorted_keys: np.ndarray, points: np.ndarray) -> np.ndarray:
+        """Points for each key, 0 for empty picks and teams without results"""
+        if len(sorted_keys) == 0:
+            return np.zeros(keys.shape)
+        positions = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+        found = (sorted_keys[positions] == keys) & (picks != 0)
+        return np.where(found, points[positions], 0.0)
+
+    def _rescore(self, event_id: str):
+        event = self.events[event_id]
+        teams, points = self.results.get(event_id, (np.zeros(0, dtype=np.int64), np.zeros(0)))
+        row_scores = self._lookup(event.picks, event.picks, teams, points).sum(axis=1)
+        np.add.at(self.totals, event.drafter_idxs, row_scores - event.row_scores)
+        event.row_scores = row_scores
+
+    def update_event_results(self, event_id: str, team_points: dict[int, float]):
+        """Rescores a single event after its results changed"""
+        self.results[event_id] = self._results_arrays(team_points)
+        if event_id in self.events:
+            self._rescore(event_id)
+
+    def update_event_picks(self, event_id: str, drafter_names: list[str], draft_cells: list[list[None | int]]):
+        """Replaces a single event's picks, moving its points between drafters"""
+        old_event = self.events.pop(event_id, None)
+        if old_event is not None:
+            np.subtract.at(self.totals, old_event.drafter_idxs, old_event.row_scores)
+            np.subtract.at(self.events_drafted, old_event.drafter_idxs, 1)
+        num_rounds = old_event.picks.shape[1] if old_event is not None else NUM_PICKS
+        num_rounds = max([num_rounds] + [len(cells) for cells in draft_cells])
+        drafter_idxs = self._drafter_idx_array(drafter_names)
+        self.events[event_id] = EventScores(drafter_idxs, self._picks_array(draft_cells, num_rounds),
+                                            np.zeros(len(drafter_names)))
+        np.add.at(self.events_drafted, drafter_idxs, 1)
+        self._rescore(event_id)
+
+    def standings(self) -> list[tuple[int, str, float, int]]:
+        """(rank, drafter, points, events drafted) best first, tied drafters share a rank"""
+        order = np.lexsort((np.array(self.drafter_names, dtype=object), -self.totals))
+        standings = []
+        for position, drafter_idx in enumerate(order):
+            points = float(self.totals[drafter_idx])
+            rank = standings[-1][0] if standings and standings[-1][2] == points else position + 1
+            standings.append((rank, self.drafter_names[drafter_idx], points, int(self.events_drafted[drafter_idx])))
+        return standings
+
+
+class StandingsTracker:
+    """Keeps a StandingsEngine current with one workbook's event pages and the team results file
+
+    Picks are reread from every event page in one batched request once they are older than PICKS_MAX_AGE, results
+    whenever the file changes, and only the events that changed are rescored. Each workbook is its own season or league
+    with its own tracker, sharing the results file since results are keyed by the event ID on the pages.
+    """
+
+    def __init__(self, sheets: AsyncSheets, event_registry: EventRegistry, workbook: str,
+                 results_path: str = TEAM_RESULTS_PATH):
+        self.sheets = sheets
+        self.event_registry = event_registry
+        self.workbook = workbook
+        self.results_path = results_path
+        self.engine = StandingsEngine()
+        self.loaded = False
+        self.picks_read_at = 0.0
+        self.results_mtime = None
+        self.event_picks: dict[str, tuple[list[str], list[list[None | int]]]] = {}
+        self.results: dict[str, dict[int, float]] = {}
+        self._refresh_lock = asyncio.Lock()
+
+    async def read_event_picks(self) -> dict[str, tuple[list[str], list[list[None | int]]]]:
+        await self.event_registry.ensure_loaded()
+        event_pages = list(self.event_registry.workbook_pages(self.workbook).items())
+        if not event_pages:
+            return {}
+        drafter_ranges = await self.sheets.get_ranges(
+            event_pages[0][1].spreadsheet.id, [drafters_range(event_page) for _, event_page in event_pages],
+            value_render=pygsheets.ValueRenderOption.UNFORMATTED_VALUE)
+        event_picks = {}
+        for (event_id, event_page), drafter_rows in zip(event_pages, drafter_ranges):
+            try:
+                event_picks[event_id] = parse_drafter_rows(drafter_rows)
+            except LookupError as err:
+                logger.warning("Leaving %s out of the standings: %s", event_page.title, err)
+        return event_picks
+
+    def read_results(self) -> dict[str, dict[int, float]] | None:
+        """Results if the file changed since it was last read, otherwise None"""
+        try:
+            mtime = os.path.getmtime(self.results_path)
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self.results_mtime:
+            return None
+        self.results_mtime = mtime
+        return load_team_results(self.results_path) if mtime is not None else {}
+
+    async def refresh(self, force: bool = False) -> StandingsEngine:
+        async with self._refresh_lock:
+            refresh_start = time.perf_counter()
+            results = self.read_results()
+            event_picks = None
+            if force or not self.loaded or time.monotonic() - self.picks_read_at > PICKS_MAX_AGE:
+                event_picks = await self.read_event_picks()
+                self.picks_read_at = time.monotonic()
+
+            if not self.loaded:
+                self.event_picks = event_picks
+                self.results = results if results is not None else {}
+                self.engine.load(self.event_picks, self.results)
+                self.loaded = True
+                logger.info("Scored %s events for %s drafters in %.3fs", len(self.event_picks),
+                            len(self.engine.drafter_names), time.perf_counter() - refresh_start)
+                return self.engine
+
+            changed_events = set()
+            if event_picks is not None:
+                for event_id in self.event_picks.keys() - event_picks.keys():
+                    self.engine.update_event_picks(event_id, [], [])  # Page removed, its points go with it
+                    changed_events.add(event_id)
+                for event_id, picks in event_picks.items():
+                    if self.event_picks.get(event_id) != picks:
+                        self.engine.update_event_picks(event_id, *picks)
+                        changed_events.add(event_id)
+                self.event_picks = event_picks
+            if results is not None:
+                for event_id in self.results.keys() | results.keys():
+                    if self.results.get(event_id) != results.get(event_id):
+                        self.engine.update_event_results(event_id, results.get(event_id, {}))
+                        changed_events.add(event_id)
+                self.results = results
+            if changed_events:
+                logger.info("Rescored %s events in %.3fs", len(changed_events), time.perf_counter() - refresh_start)
+            return self.engine
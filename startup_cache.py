@@ -0,0 +1,79 @@
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import time
+
+from discord import app_commands
+
+logger = logging.getLogger('fantasy_first')
+
+
+def fingerprint(data: bytes | str) -> str:
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def command_tree_fingerprint(tree: app_commands.CommandTree) -> str:
+    """Hash of the payload tree.sync() would upload for the global commands"""
+    payload = [command.to_dict() for command in tree.get_commands()]
+    return fingerprint(json.dumps(payload, sort_keys=True, default=str))
+
+
+class StartupCache:
+    """Fingerprints of what was last pushed to Discord, so restarts can skip unchanged command syncs and avatar uploads
+
+    Kept per application ID, so switching between the test and production bots doesn't skip a needed sync.
+    """
+
+    def __init__(self, path: str, application_id: int):
+        self.path = path
+        self.application_id = str(application_id)
+        self._entries: dict[str, dict[str, str]] = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as cache_file:
+                self._entries = json.load(cache_file)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as err:
+            logger.warning("Ignoring unreadable startup cache %s: %s", path, err)
+
+    def get(self, key: str) -> str | None:
+        return self._entries.get(self.application_id, {}).get(key)
+
+    def set(self, key: str, value: str):
+        self._entries.setdefault(self.application_id, {})[key] = value
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as cache_file:
+            json.dump(self._entries, cache_file, indent=2)
+        os.replace(tmp_path, self.path)  # Never leaves a half written cache behind
+
+
+class StartupTimer:
+    """Durations of named startup phases, logged together once the bot is ready"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last_phase_end = self.start
+        self.phases: dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        phase_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.last_phase_end = time.perf_counter()
+            self.phases[name] = self.last_phase_end - phase_start
+
+    def mark(self, name: str):
+        """Records the time since the previous phase ended, for waits that happen outside the bot's code like logging in"""
+        now = time.perf_counter()
+        self.phases[name] = now - self.last_phase_end
+        self.last_phase_end = now
+
+    def summary(self) -> str:
+        phases = ', '.join(f"{name} {duration:.3f}s" for name, duration in self.phases.items())
+        return f"{phases}, total {time.perf_counter() - self.start:.3f}s"
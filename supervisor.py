@@ -0,0 +1,167 @@
+import asyncio
+import enum
+import logging
+import time
+import typing
+from dataclasses import dataclass, field
+
+MAX_CONCURRENT_DRAFTS = 16
+MAX_DRAFT_RESTARTS = 3
+RESTART_BACKOFF = 5.0  # Seconds before the first restart, doubles for each restart after that
+MAX_RESTART_BACKOFF = 300.0
+RESTART_RESET_AFTER = 600.0  # Seconds a draft has to run cleanly before its restart count is reset
+SHUTDOWN_TIMEOUT = 30.0
+
+logger = logging.getLogger('fantasy_first')
+
+
+class Draft(typing.Protocol):
+    async def run_draft(self): ...
+
+    def stop_draft(self): ...
+
+    def is_stopped(self) -> bool: ...
+
+
+DraftFactory = typing.Callable[[], typing.Awaitable[Draft]]
+FailureCallback = typing.Callable[[BaseException], typing.Awaitable]
+
+
+class DraftHealth(enum.Enum):
+    RUNNING = 'running'
+    RESTARTING = 'restarting'
+    FAILED = 'failed'  # Gave up after too many restarts
+    FINISHED = 'finished'
+    STOPPED = 'stopped'  # Stopped by an admin or the bot shutting down
+
+
+@dataclass
+class SupervisedDraft:
+    event_id: str
+    draft: Draft
+    restart_factory: DraftFactory
+    on_failure: FailureCallback | None = None
+    health: DraftHealth = DraftHealth.RUNNING
+    restarts: int = 0
+    last_error: BaseException | None = None
+    started_at: float = field(default_factory=time.time)
+    task: asyncio.Task | None = None
+
+
+class DraftSupervisor:
+    """Runs each draft as its own background task
+
+    A draft that raises is rebuilt with its restart factory (which resumes it from its saved state) after a backoff,
+    up to max_restarts times in a row. At most max_concurrent drafts run at once, and shutdown() stops all of them so
+    their pending picks are flushed before the bot exits.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_DRAFTS, max_restarts: int = MAX_DRAFT_RESTARTS):
+        self.max_concurrent = max_concurrent
+        self.max_restarts = max_restarts
+        self.drafts: dict[str, SupervisedDraft] = {}  # Running or restarting
+        self.ended: dict[str, SupervisedDraft] = {}  # Last finished, stopped or failed draft of each event
+        self._shutting_down = False
+
+    def at_capacity(self) -> bool:
+        return len(self.drafts) >= self.max_concurrent
+
+    def start(self, event_id: str, draft: Draft, restart_factory: DraftFactory,
+              on_failure: FailureCallback = None) -> SupervisedDraft:
+        """Starts running a draft in the background, raises RuntimeError if it can't be started"""
+        if self._shutting_down:
+            raise RuntimeError("Bot is shutting down, cannot start drafts")
+        if event_id in self.drafts:
+            raise RuntimeError(f"Draft already exists for event **{event_id}**")
+        if self.at_capacity():
+            raise RuntimeError(f"Already running the maximum of {self.max_concurrent} drafts")
+
+        supervised = SupervisedDraft(event_id=event_id, draft=draft, restart_factory=restart_factory,
+                                     on_failure=on_failure)
+        self.ended.pop(event_id, None)
+        self.drafts[event_id] = supervised
+        supervised.task = asyncio.create_task(self._supervise(supervised), name=f"draft-{event_id}")
+        return supervised
+
+    async def _supervise(self, supervised: SupervisedDraft):
+        try:
+            while True:
+                run_start = time.time()
+                try:
+                    await supervised.draft.run_draft()
+                except asyncio.CancelledError:
+                    supervised.health = DraftHealth.STOPPED
+                    raise
+                except Exception as err:
+                    supervised.last_error = err
+                    logger.exception("Draft %s failed", supervised.event_id)
+                else:
+                    supervised.health = DraftHealth.STOPPED if supervised.draft.is_stopped() else DraftHealth.FINISHED
+                    logger.info("Draft %s %s", supervised.event_id, supervised.health.value)
+                    return
+
+                if time.time() - run_start > RESTART_RESET_AFTER:
+                    supervised.restarts = 0
+                if supervised.restarts >= self.max_restarts:
+                    supervised.health = DraftHealth.FAILED
+                    logger.error("Draft %s failed %s times in a row, giving up",
+                                 supervised.event_id, supervised.restarts + 1)
+                    await self._notify_failure(supervised)
+                    return
+
+                supervised.health = DraftHealth.RESTARTING
+                backoff = min(MAX_RESTART_BACKOFF, RESTART_BACKOFF * 2 ** supervised.restarts)
+                supervised.restarts += 1
+                logger.info("Restarting draft %s in %.0fs (restart %s/%s)",
+                            supervised.event_id, backoff, supervised.restarts, self.max_restarts)
+                await asyncio.sleep(backoff)
+                try:
+                    supervised.draft = await supervised.restart_factory()
+                except Exception as err:
+                    supervised.last_error = err
+                    supervised.health = DraftHealth.FAILED
+                    logger.exception("Could not restart draft %s", supervised.event_id)
+                    await self._notify_failure(supervised)
+                    return
+                supervised.health = DraftHealth.RUNNING
+        finally:
+            self.drafts.pop(supervised.event_id, None)
+            self.ended[supervised.event_id] = supervised
+
+    async def _notify_failure(self, supervised: SupervisedDraft):
+        if supervised.on_failure is None:
+            return
+        try:
+            await supervised.on_failure(supervised.last_error)
+        except Exception:
+            logger.exception("Failure callback for %s raised", supervised.event_id)
+
+    def get(self, event_id: str) -> Draft | None:
+        supervised = self.drafts.get(event_id)
+        return supervised.draft if supervised is not None else None
+
+    def __contains__(self, event_id: str) -> bool:
+        return event_id in self.drafts
+
+    def __len__(self) -> int:
+        return len(self.drafts)
+
+    def items(self) -> list[tuple[str, Draft]]:
+        return [(event_id, supervised.draft) for event_id, supervised in self.drafts.items()]
+
+    def health(self) -> dict[str, SupervisedDraft]:
+        """Every running draft, plus how the last draft of each other event ended"""
+        return {**self.ended, **self.drafts}
+
+    async def shutdown(self, timeout: float = SHUTDOWN_TIMEOUT):
+        """Cancels every draft and waits for them to clean up, their saved state is kept so they can be resumed"""
+        self._shutting_down = True
+        tasks = [supervised.task for supervised in self.drafts.values() if supervised.task is not None]
+        if not tasks:
+            return
+        logger.info("Shutting down %s drafts", len(tasks))
+        for task in tasks:
+            task.cancel()
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        if pending:
+            logger.warning("%s drafts did not shut down within %.0fs", len(pending), timeout)
@@ -0,0 +1,60 @@
+import typing
+
+
+class TeamAvailability:
+    """Ordered event team list with a bitmap of picked slots
+
+    Picking and lookups are O(1), and comparing bitmaps gives the teams that changed since a previous state, which
+    lets the button grid only touch what changed.
+    """
+
+    def __init__(self, teams: typing.Iterable[int]):
+        self.teams: list[int] = list(teams)
+        self.slots: dict[int, int] = {team: slot for slot, team in enumerate(self.teams)}
+        self.picked_bits = 0
+        self.num_picked = 0
+
+    def pick(self, team: int) -> int:
+        """Marks a team as picked, returning its slot. Raises ValueError like list.remove if it is not available"""
+        slot = self.slots.get(team)
+        if slot is None or self.picked_bits >> slot & 1:
+            raise ValueError(f"Team {team} is not available")
+        self.picked_bits |= 1 << slot
+        self.num_picked += 1
+        return slot
+
+    def unpick(self, team: int):
+        slot = self.slots[team]
+        if self.picked_bits >> slot & 1:
+            self.picked_bits &= ~(1 << slot)
+            self.num_picked -= 1
+
+    def is_available(self, team: int) -> bool:
+        slot = self.slots.get(team)
+        return slot is not None and not self.picked_bits >> slot & 1
+
+    def state(self) -> int:
+        """Bitmap of picked slots, to pass to changed_since() later"""
+        return self.picked_bits
+
+    def changed_since(self, state: int) -> list[int]:
+        """Teams whose picked status differs from the given state, in team list order"""
+        changed = []
+        diff = self.picked_bits ^ state
+        while diff:
+            lowest_bit = diff & -diff
+            changed.append(self.teams[lowest_bit.bit_length() - 1])
+            diff ^= lowest_bit
+        return changed
+
+    def available_teams(self) -> list[int]:
+        return [team for slot, team in enumerate(self.teams) if not self.picked_bits >> slot & 1]
+
+    def __contains__(self, team: int) -> bool:
+        return self.is_available(team)
+
+    def __iter__(self) -> typing.Iterator[int]:
+        return iter(self.available_teams())
+
+    def __len__(self) -> int:
+        return len(self.teams) - self.num_picked
@@ -0,0 +1,38 @@
+import bisect
+
+from team_availability import TeamAvailability
+
+MAX_TEAM_CHOICES = 25  # Discord's autocomplete limit
+
+
+class TeamSearchIndex:
+    """Sorted prefix index over an event's team numbers and the words of their names, for /pick autocomplete
+
+    Built once per draft, each search is a binary search plus a walk over the matching keys, so autocomplete answers
+    without scanning every team on each keystroke.
+    """
+
+    def __init__(self, team_name_dict: dict[int, str]):
+        self.teams = list(team_name_dict)
+        keys = set()
+        for team, team_name in team_name_dict.items():
+            keys.add((str(team), team))
+            name = str(team_name).lower()
+            keys.add((name, team))
+            for word in name.split():
+                keys.add((word, team))
+        self._keys: list[tuple[str, int]] = sorted(keys)
+
+    def search(self, text: str, teams_left: TeamAvailability, limit: int = MAX_TEAM_CHOICES) -> list[int]:
+        """Available teams whose number, name or a word of their name starts with the text, numbers first"""
+        text = text.strip().lower()
+        if not text:
+            return [team for team in self.teams if teams_left.is_available(team)][:limit]
+        matches = {}  # Ordered set
+        idx = bisect.bisect_left(self._keys, (text, -1))
+        while idx < len(self._keys) and len(matches) < limit and self._keys[idx][0].startswith(text):
+            team = self._keys[idx][1]
+            if teams_left.is_available(team):
+                matches[team] = None
+            idx += 1
+        return list(matches)
@@ -0,0 +1,147 @@
+import asyncio
+import os
+import random
+import tempfile
+import unittest
+
+from bench_draft import DraftScript, create_event, drive_draft, wait_for_turn
+from draft import parse_drafter_rows
+from fakes import ApiStats, FakeBot, FakeGuild, FakeInteraction, FakeSheetsClient, FakeSpreadsheet, Latency
+from outbound_queue import outbound_queue
+from sheet_access import AsyncSheets
+
+NUM_DRAFTERS = 3
+NUM_TEAMS = 12
+NUM_ROUNDS = 3
+
+
+class ParseDrafterRowsTest(unittest.TestCase):
+    def test_trailing_blank_rows_end_the_list(self):
+        drafter_names, draft_cells = parse_drafter_rows([['Alice', 254, '', 1678], ['Bob'], [], ['']], num_picks=2)
+        self.assertEqual(drafter_names, ['Alice', 'Bob'])
+        self.assertEqual(draft_cells, [[254, 1678], [None, None]])
+
+    def test_blank_row_between_drafters_is_an_error(self):
+        # Skipping it would write every later drafter's picks one row too high
+        with self.assertRaises(LookupError):
+            parse_drafter_rows([['Alice'], [''], ['Carol']])
+
+
+class DraftLoopTest(unittest.IsolatedAsyncioTestCase):
+    """Full drafts against the fakes, driven the way bench_draft.py does"""
+
+    async def asyncSetUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.old_cwd = os.getcwd()
+        os.chdir(self.work_dir.name)  # Pick journals are written relative to the working directory
+        outbound_queue.set_rate_limits(10 ** 6, 1.0, 10 ** 6)
+        self.stats = ApiStats()
+        spreadsheet = FakeSpreadsheet()
+        self.sheets = AsyncSheets(lambda: FakeSheetsClient(spreadsheet, self.stats))
+        self.bot = FakeBot()
+        self.event = await create_event(0, NUM_DRAFTERS, NUM_TEAMS, NUM_ROUNDS, FakeGuild(), self.bot, spreadsheet,
+                                        self.sheets, self.stats, Latency(), journal_flush_delay=0.0)
+        self.draft = self.event.draft
+        self.draft_task = asyncio.create_task(self.draft.run_draft())
+
+    async def asyncTearDown(self):
+        if not self.draft_task.done():
+            self.draft.stop_draft()
+            await self.draft_task
+        self.sheets.shutdown()
+        self.bot.draft_states.close()
+        os.chdir(self.old_cwd)
+        self.work_dir.cleanup()
+
+    async def click(self, drafter, team_num: int) -> FakeInteraction:
+        interaction = FakeInteraction(self.event.channel, self.bot, drafter)
+        await self.draft.grid.team_buttons[team_num].callback(interaction)
+        return interaction
+
+    async def finish_draft(self):
+        script = DraftScript(skip_rate=0.0, timeout_rate=0.0, late_pick_rate=0.0)
+        await drive_draft(self.event, self.draft_task, script, random.Random(0))
+        while len(outbound_queue):
+            await asyncio.sleep(0.001)
+
+    async def test_double_click_is_ignored(self):
+        self.assertTrue(await wait_for_turn(self.draft, self.draft_task))
+        drafter = self.draft.current_drafter_user
+        first_team, second_team = self.draft.all_teams[:2]
+        # Both clicks land before the draft loop wakes up
+        first_click, second_click = await asyncio.gather(self.click(drafter, first_team),
+                                                         self.click(drafter, second_team))
+        await self.finish_draft()
+
+        self.assertEqual(len([team for picks in self.draft.draft_picks.values() for team in picks if team is not None]),
+                         NUM_DRAFTERS * NUM_ROUNDS)
+        # The first click is their pick, the second got its public reply corrected
+        self.assertEqual(self.draft.draft_picks[drafter.nick][0], first_team)
+        self.assertIn("Ignored", second_click.response.content)
+
+    async def test_find_drafter_skips_members_who_cant_see_the_channel(self):
+        drafter_name = self.draft.drafter_names[0]
+        drafter = self.event.drafters[drafter_name]
+        guild = self.event.channel.guild
+        namesake = guild.add_member(drafter_name)
+        guild.members.insert(0, guild.members.pop())  # Indexed before the drafter
+        self.event.channel.hidden_from.add(namesake)
+        self.bot.member_index.forget_guild(guild)
+        self.assertIs(self.draft.find_drafter(drafter_name), drafter)
+
+    async def test_reminder_sent_after_the_pick_is_deleted(self):
+        self.assertTrue(await wait_for_turn(self.draft, self.draft_task))
+        drafter = self.draft.current_drafter_user
+        dm_sent = asyncio.Event()
+        dm_released = asyncio.Event()
+        send_dm = drafter.send
+
+        async def slow_send(content: str = '', **kwargs):
+            dm_sent.set()
+            await dm_released.wait()
+            return await send_dm(content, **kwargs)
+
+        drafter.send = slow_send
+        reminder_task = asyncio.create_task(self.draft.send_reminder(drafter, "Pick soon in {}"))
+        await dm_sent.wait()
+        # They pick while the reminder is still in flight
+        await self.click(drafter, self.draft.all_teams[0])
+        self.assertTrue(await wait_for_turn(self.draft, self.draft_task))
+        dm_released.set()
+        await reminder_task
+        while len(outbound_queue) or outbound_queue._request_tasks:  # Until the delete has gone out too
+            await asyncio.sleep(0.001)
+
+        self.assertEqual(self.draft.reminder_msgs, [])
+        self.assertEqual([msg for msg in drafter.dm_channel.messages.values() if msg.content.startswith("Pick soon")], [])
+
+    async def test_late_picks_apply_in_click_order(self):
+        num_picks = NUM_DRAFTERS * NUM_ROUNDS
+        rng = random.Random(0)
+        skipped_drafter = None
+        while await wait_for_turn(self.draft, self.draft_task):
+            if self.draft.pick_num >= num_picks:
+                break  # Only the skipped drafter's pick is left
+            if self.draft.pick_num == num_picks - 1:
+                skipped_drafter = self.draft.current_drafter_user
+                await self.draft.skip_button.callback(FakeInteraction(self.event.channel, self.bot, self.event.admin))
+            else:
+                await self.click(self.draft.current_drafter_user, rng.choice(self.draft.teams_left.available_teams()))
+
+        # Clicked in the opposite order of the grid, so applying in grid order would pick the wrong team
+        available_teams = self.draft.teams_left.available_teams()
+        later_team, earlier_team = available_teams[0], available_teams[-1]
+        earlier_click, later_click = await asyncio.gather(self.click(skipped_drafter, earlier_team),
+                                                          self.click(skipped_drafter, later_team))
+        await self.draft_task
+
+        self.assertIn(earlier_team, self.draft.draft_picks[skipped_drafter.nick])
+        self.assertTrue(self.draft.teams_left.is_available(later_team))
+        while len(outbound_queue):
+            await asyncio.sleep(0.001)
+        self.assertIn("Ignored", later_click.response.content)
+        self.assertNotIn("Ignored", earlier_click.response.content)
+
+
+if __name__ == '__main__':
+    unittest.main()
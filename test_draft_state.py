@@ -0,0 +1,45 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+from draft_state import DraftState, DraftStateStore
+
+START = datetime.datetime(2024, 3, 1, 14, 0, tzinfo=datetime.timezone.utc)
+
+
+def make_state(event_id: str) -> DraftState:
+    return DraftState(event_id=event_id, channel_id=42, all_teams=[254, 1678], team_name_dict={254: 'A', 1678: 'B'},
+                      drafter_names=['Alice'], draft_picks={'Alice': [None]}, draft_start_time=START,
+                      draft_end_datetime=START + datetime.timedelta(days=2), pick_deadlines={0: START})
+
+
+class DraftStateStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.store = DraftStateStore(os.path.join(self.work_dir.name, 'drafts.sqlite3'))
+
+    def tearDown(self):
+        self.store.close()
+        self.work_dir.cleanup()
+
+    def test_round_trip(self):
+        self.store.save(make_state('event'), 'pick', 'Alice', 0, 254)
+        self.assertEqual(self.store.load('event'), make_state('event'))
+
+    def test_unreadable_state_is_quarantined_not_overwritten(self):
+        self.store.save(make_state('event'))
+        self.store.db.execute("UPDATE drafts SET state = ? WHERE event_id = ?", ('{"version": 99}', 'event'))
+
+        with self.assertLogs('fantasy_first', 'ERROR'):
+            self.assertIsNone(self.store.load('event'))
+        self.store.save(make_state('event'))  # The draft starting over
+
+        self.assertEqual(self.store.load('event'), make_state('event'))
+        [(bad_state, error)] = self.store.quarantined('event')
+        self.assertEqual(bad_state, '{"version": 99}')
+        self.assertIn("Unsupported draft state version", error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import copy
+import unittest
+
+from fakes import FakeGuild
+from member_index import MemberIndex
+
+
+class MemberIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.guild = FakeGuild()
+        self.first = self.guild.add_member('Sam')
+        self.second = self.guild.add_member('Sam')
+        self.other = self.guild.add_member('Alex')
+        self.index = MemberIndex()
+
+    def test_build_keeps_every_member_with_a_nick(self):
+        self.assertEqual(self.index.get(self.guild, 'Sam'), [self.first, self.second])
+        self.assertEqual(self.index.get(self.guild, 'Alex'), [self.other])
+        self.assertEqual(self.index.get(self.guild, 'Nobody'), [])
+
+    def test_add_keeps_the_members_already_indexed(self):
+        self.index.build(self.guild)
+        third = self.guild.add_member('Sam')
+        self.index.add(third)
+        self.assertEqual(self.index.get(self.guild, 'Sam'), [self.first, self.second, third])
+
+    def test_remove_leaves_the_other_member_with_the_nick(self):
+        self.index.build(self.guild)
+        self.index.remove(self.first)
+        self.assertEqual(self.index.get(self.guild, 'Sam'), [self.second])
+        self.index.remove(self.second)
+        self.assertEqual(self.index.get(self.guild, 'Sam'), [])
+
+    def test_update_moves_a_member_between_nicks(self):
+        self.index.build(self.guild)
+        renamed = copy.copy(self.first)
+        renamed.nick = 'Alex'
+        self.index.update(self.first, renamed)
+        self.assertEqual(self.index.get(self.guild, 'Sam'), [self.second])
+        self.assertEqual(self.index.get(self.guild, 'Alex'), [self.other, renamed])
+
+    def test_update_without_a_nick_change_replaces_the_member(self):
+        self.index.build(self.guild)
+        updated = copy.copy(self.second)
+        self.index.update(self.second, updated)
+        members = self.index.get(self.guild, 'Sam')
+        self.assertEqual(members, [self.first, self.second])
+        self.assertIs(members[1], updated)
+
+
+if __name__ == '__main__':
+    unittest.main()
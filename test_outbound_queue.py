@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+
+from outbound_queue import OutboundQueue, Priority
+
+BUCKET = ('channel', 1)
+
+
+class OutboundQueueTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Limits high enough that only the queue order decides what goes out when
+        self.queue = OutboundQueue(bucket_capacity=100, bucket_period=1.0, global_per_second=1000)
+        self.sent = []
+        self.release = asyncio.Event()
+
+    async def asyncTearDown(self):
+        if self.queue._task is not None:
+            self.queue._task.cancel()
+
+    def request(self, name: str):
+        async def send():
+            self.sent.append(name)
+            return name
+        return send
+
+    async def hold_bucket(self):
+        """Puts a request in flight on the bucket, so later ones queue up behind it until release is set"""
+        async def blocker():
+            await self.release.wait()
+            return 'blocker'
+        future = self.queue.submit(Priority.URGENT, BUCKET, blocker)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return future
+
+    async def drain(self, *futures: asyncio.Future):
+        self.release.set()
+        await asyncio.wait_for(asyncio.gather(*futures), 1)
+
+    async def test_sends_most_urgent_first_then_in_order(self):
+        blocker = await self.hold_bucket()
+        futures = [self.queue.submit(Priority.BACKGROUND, BUCKET, self.request('delete')),
+                   self.queue.submit(Priority.NORMAL, BUCKET, self.request('edit 1')),
+                   self.queue.submit(Priority.URGENT, BUCKET, self.request('ping')),
+                   self.queue.submit(Priority.NORMAL, BUCKET, self.request('edit 2'))]
+        await self.drain(blocker, *futures)
+        self.assertEqual(self.sent, ['ping', 'edit 1', 'edit 2', 'delete'])
+
+    async def test_coalesced_request_only_sends_the_latest(self):
+        blocker = await self.hold_bucket()
+        first = self.queue.submit(Priority.NORMAL, BUCKET, self.request('table v1'), coalesce_key=('edit', 5))
+        second = self.queue.submit(Priority.NORMAL, BUCKET, self.request('table v2'), coalesce_key=('edit', 5))
+        other = self.queue.submit(Priority.NORMAL, BUCKET, self.request('grid'), coalesce_key=('edit', 6))
+        await self.drain(blocker, first, second, other)
+        self.assertEqual(self.sent, ['table v2', 'grid'])
+        self.assertEqual(first.result(), 'table v2')  # Both callers get the result of the request that went out
+        self.assertEqual(second.result(), 'table v2')
+
+    async def test_coalescing_keeps_the_more_urgent_priority(self):
+        blocker = await self.hold_bucket()
+        futures = [self.queue.submit(Priority.BACKGROUND, BUCKET, self.request('edit v1'), coalesce_key=('edit', 5)),
+                   self.queue.submit(Priority.NORMAL, BUCKET, self.request('reminder')),
+                   self.queue.submit(Priority.URGENT, BUCKET, self.request('edit v2'), coalesce_key=('edit', 5)),
+                   self.queue.submit(Priority.BACKGROUND, BUCKET, self.request('edit v3'), coalesce_key=('edit', 5))]
+        await self.drain(blocker, *futures)
+        self.assertEqual(self.sent, ['edit v3', 'reminder'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import datetime
+import random
+import unittest
+import zoneinfo
+
+from pick_deadlines import compute_pick_deadlines
+
+TZ = zoneinfo.ZoneInfo("America/New_York")
+ACTIVE_START = datetime.time(hour=10)
+ACTIVE_END = datetime.time(hour=22)
+SNAP_MINUTES = 15
+
+
+def reference_deadlines(draft_start: datetime.datetime, draft_end: datetime.datetime,
+                        num_picks: int) -> list[datetime.datetime]:
+    """The timedelta loop run_draft used before compute_pick_deadlines, kept to check the engine against"""
+    start_active_start = datetime.datetime.combine(draft_start.date(), ACTIVE_START, tzinfo=TZ)
+    start_active_end = datetime.datetime.combine(draft_start.date(), ACTIVE_END, tzinfo=TZ)
+    end_active_start = datetime.datetime.combine(draft_end.date(), ACTIVE_START, tzinfo=TZ)
+    end_active_end = datetime.datetime.combine(draft_end.date(), ACTIVE_END, tzinfo=TZ)
+    draft_end = min(end_active_end, draft_end)
+
+    day_lengths = []
+    start_day_start = min(start_active_end, max(start_active_start, draft_start))
+    end_day_end = min(end_active_end, max(end_active_start, draft_end))
+    if draft_start.date() == draft_end.date():
+        day_lengths.append(end_day_end - start_day_start)
+    else:
+        day_lengths.append(start_active_end - start_day_start)
+        num_full_days = max(0, (draft_end.date() - draft_start.date()).days + 1 - 2)
+        day_lengths.extend([start_active_end - start_active_start] * num_full_days)
+        day_lengths.append(end_day_end - end_active_start)
+
+    time_per_pick = sum(day_lengths, datetime.timedelta(0)) / num_picks
+    deadlines = []
+    day_idx = 0
+    day_total = datetime.timedelta(0)
+    for pick_num in range(1, num_picks + 1):
+        pick_point = pick_num * time_per_pick
+        while day_total + day_lengths[day_idx] < pick_point - datetime.timedelta(seconds=1):
+            day_total += day_lengths[day_idx]
+            day_idx += 1
+        if day_idx == 0:
+            day_start = start_day_start
+        else:
+            day_start = datetime.datetime.combine(draft_start.date() + datetime.timedelta(days=day_idx), ACTIVE_START,
+                                                  tzinfo=TZ)
+        deadline = day_start + (pick_point - day_total)
+        discard = datetime.timedelta(minutes=deadline.minute % SNAP_MINUTES, seconds=deadline.second,
+                                     microseconds=deadline.microsecond)
+        deadline -= discard
+        if discard >= datetime.timedelta(minutes=SNAP_MINUTES / 2.0):
+            deadline += datetime.timedelta(minutes=SNAP_MINUTES)
+        deadlines.append(deadline)
+    return deadlines
+
+
+def engine_deadlines(draft_start: datetime.datetime, draft_end: datetime.datetime,
+                     num_picks: int) -> list[datetime.datetime]:
+    return compute_pick_deadlines(draft_start, draft_end, num_picks, TZ, (ACTIVE_START, ACTIVE_END),
+                                  SNAP_MINUTES).deadlines
+
+
+class PickDeadlinesTest(unittest.TestCase):
+    def assertMatchesReference(self, draft_start: datetime.datetime, draft_end: datetime.datetime, num_picks: int):
+        self.assertEqual(engine_deadlines(draft_start, draft_end, num_picks),
+                         reference_deadlines(draft_start, draft_end, num_picks))
+
+    def test_near_half_interval_snaps_like_timedeltas(self):
+        # Pick 11 lands 4us before 17:37:30, float seconds rounded that up to the tie and snapped it to 17:45
+        draft_start = datetime.datetime(2024, 3, 15, 13, 15, tzinfo=TZ)
+        draft_end = datetime.datetime(2024, 3, 20, 8, 40, tzinfo=TZ)
+        deadlines = engine_deadlines(draft_start, draft_end, 22)
+        self.assertEqual(deadlines[10], datetime.datetime(2024, 3, 17, 17, 30, tzinfo=TZ))
+        self.assertMatchesReference(draft_start, draft_end, 22)
+
+    def test_same_day(self):
+        draft_start = datetime.datetime(2024, 3, 1, 14, 7, tzinfo=TZ)
+        draft_end = datetime.datetime(2024, 3, 1, 20, 0, tzinfo=TZ)
+        deadlines = engine_deadlines(draft_start, draft_end, 6)
+        self.assertEqual(deadlines[-1], draft_end)
+        self.assertMatchesReference(draft_start, draft_end, 6)
+
+    def test_start_before_and_end_after_active_hours(self):
+        draft_start = datetime.datetime(2024, 3, 1, 7, 0, tzinfo=TZ)
+        draft_end = datetime.datetime(2024, 3, 4, 23, 30, tzinfo=TZ)
+        schedule = compute_pick_deadlines(draft_start, draft_end, 24, TZ, (ACTIVE_START, ACTIVE_END), SNAP_MINUTES)
+        self.assertEqual(schedule.draft_end, datetime.datetime(2024, 3, 4, 22, 0, tzinfo=TZ))
+        self.assertEqual(schedule.total_draft_time, datetime.timedelta(hours=48))
+        self.assertEqual(schedule.time_per_pick, datetime.timedelta(hours=2))
+        self.assertMatchesReference(draft_start, draft_end, 24)
+
+    def test_day_boundary_picks_stay_on_their_day(self):
+        # 12 active hours a day, 6 picks a day, every sixth pick lands on the end of a day and not the next morning
+        draft_start = datetime.datetime(2024, 3, 1, 10, 0, tzinfo=TZ)
+        draft_end = datetime.datetime(2024, 3, 3, 22, 0, tzinfo=TZ)
+        deadlines = engine_deadlines(draft_start, draft_end, 18)
+        self.assertEqual(deadlines[5], datetime.datetime(2024, 3, 1, 22, 0, tzinfo=TZ))
+        self.assertEqual(deadlines[6], datetime.datetime(2024, 3, 2, 12, 0, tzinfo=TZ))
+        self.assertMatchesReference(draft_start, draft_end, 18)
+
+    def test_across_dst_change(self):
+        draft_start = datetime.datetime(2024, 3, 8, 16, 23, 11, 500, tzinfo=TZ)
+        draft_end = datetime.datetime(2024, 3, 12, 19, 5, tzinfo=TZ)
+        self.assertMatchesReference(draft_start, draft_end, 21)
+
+    def test_random_cases_match_reference(self):
+        rng = random.Random(9)
+        base = datetime.datetime(2024, 3, 1, tzinfo=TZ)
+        for _ in range(3000):
+            draft_start = base + datetime.timedelta(minutes=rng.randrange(0, 30 * 24 * 60, 5))
+            draft_end = draft_start + datetime.timedelta(minutes=rng.randrange(60, 7 * 24 * 60, 5))
+            num_picks = rng.randint(1, 40)
+            with self.subTest(draft_start=draft_start, draft_end=draft_end, num_picks=num_picks):
+                self.assertMatchesReference(draft_start, draft_end, num_picks)
+
+
+if __name__ == '__main__':
+    unittest.main()
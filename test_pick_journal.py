@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from pick_journal import PickJournal
+
+
+class FakeEventPage:
+    """Stands in for the AsyncWorksheet, writes fail while down is set"""
+
+    def __init__(self):
+        self.title = 'Test Event'
+        self.cells = {}
+        self.down = False
+
+    async def update_values(self, batch: dict):
+        if self.down:
+            raise ConnectionError("Sheets is down")
+        self.cells.update(batch)
+
+
+class PickJournalTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.journal_path = os.path.join(self.work_dir.name, 'journals', 'event.jsonl')
+        self.event_page = FakeEventPage()
+
+    async def asyncTearDown(self):
+        self.work_dir.cleanup()
+
+    async def test_unflushed_picks_are_replayed_after_a_crash(self):
+        self.event_page.down = True
+        journal = PickJournal(self.event_page, self.journal_path, flush_delay=0.0)
+        journal.start()
+        journal.record((4, 2), 254)
+        journal.record((5, 2), 1678)
+        journal.record((4, 2), 971)  # Overwrites the first pick
+        await journal._synced()
+
+        # The process dies here: the flusher never gets through and the journal is never closed
+        journal._flush_task.cancel()
+        with open(self.journal_path, 'a', encoding='utf-8') as journal_file:
+            journal_file.write('{"op": "write", "cell": [6, ')  # Torn write of the entry in progress
+
+        self.event_page.down = False
+        recovered = PickJournal(self.event_page, self.journal_path, flush_delay=0.0)
+        self.assertEqual(recovered.load(), {(4, 2): 971, (5, 2): 1678})
+        recovered.start()
+        await recovered.close()
+        self.assertEqual(self.event_page.cells, {(4, 2): 971, (5, 2): 1678})
+        self.assertEqual(PickJournal(self.event_page, self.journal_path).load(), {})
+
+    async def test_flushed_picks_are_not_replayed(self):
+        journal = PickJournal(self.event_page, self.journal_path, flush_delay=0.0)
+        journal.start()
+        journal.record((4, 2), 254)
+        await journal.close()
+        self.assertEqual(self.event_page.cells, {(4, 2): 254})
+        self.assertEqual(PickJournal(self.event_page, self.journal_path).load(), {})
+
+    async def test_picks_in_one_loop_pass_share_an_fsync(self):
+        self.event_page.down = True
+        journal = PickJournal(self.event_page, self.journal_path, flush_delay=0.0)
+        with mock.patch('pick_journal.os.fsync') as fsync:
+            for row in range(4, 10):
+                journal.record((row, 2), row)
+            await journal._synced()
+            self.assertEqual(fsync.call_count, 1)
+        await journal.close(timeout=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
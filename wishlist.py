@@ -0,0 +1,41 @@
+import re
+import typing
+
+from team_availability import TeamAvailability
+
+MAX_WISHLIST_TEAMS = 100
+
+
+def parse_wishlist(text: str) -> list[int]:
+    """Team numbers in order from text like '254, 1678 118', duplicates after the first are dropped"""
+    tokens = [token for token in re.split(r'[\s,;]+', text.strip()) if token]
+    invalid = [token for token in tokens if not token.isdigit()]
+    if invalid:
+        raise ValueError(f"Not team numbers: {', '.join(invalid)}")
+    teams = list(dict.fromkeys(int(token) for token in tokens))
+    if len(teams) > MAX_WISHLIST_TEAMS:
+        raise ValueError(f"Wishlists are limited to {MAX_WISHLIST_TEAMS} teams")
+    return teams
+
+
+class Wishlist:
+    """A drafter's teams in order of preference, with a cursor past the leading teams that were already picked
+
+    Teams only ever get picked during a draft, so the cursor only moves forward and finding the best available team
+    costs O(1) amortized over the whole draft instead of rescanning the list every turn.
+    """
+
+    def __init__(self, teams: typing.Iterable[int]):
+        self.teams: list[int] = list(teams)
+        self.cursor = 0
+
+    def available(self, teams_left: TeamAvailability) -> typing.Iterator[int]:
+        """Available teams from most to least wanted"""
+        while self.cursor < len(self.teams) and not teams_left.is_available(self.teams[self.cursor]):
+            self.cursor += 1
+        for team in self.teams[self.cursor:]:
+            if teams_left.is_available(team):
+                yield team
+
+    def __len__(self) -> int:
+        return len(self.teams)